@@ -1,33 +1,119 @@
 # apps/authentication/authentication.py
 
+import copy
+import time
+
 import jwt
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from django.conf import settings
+from django.db import router
+from apps.authentication.cache import token_cache, user_cache
 from apps.authentication.models import BlacklistedToken, AuthToken
+from apps.authentication.utils import TOKEN_USER_CLAIMS, hash_token
 from apps.users.models import User
 
 
 class JWTAuthentication(BaseAuthentication):
     def authenticate(self, request):
-        auth_header = request.headers.get('Authorization')
+        token = self.get_token(request)
+        if token is None:
+            return None
+
+        # Un token ya verificado y no revocado se sirve desde la cache
+        # hasta su expiración o la del TTL de la cache.
+        token_key = hash_token(token)
+        payload = token_cache.get(token_key)
+        if payload is None:
+            payload = self.validate_token(token)
+            self.cache_payload(token_key, payload)
+
+        if self.is_stateless(payload):
+            return (self.get_token_user(payload), token)
+        return (self.get_user(str(payload['user_id'])), token)
+
+    async def aauthenticate(self, request):
+        """Same as ``authenticate`` for async views, using the async ORM."""
+        token = self.get_token(request)
+        if token is None:
+            return None
+
+        token_key = hash_token(token)
+        payload = token_cache.get(token_key)
+        if payload is None:
+            if await BlacklistedToken.ais_blacklisted(token):
+                raise AuthenticationFailed('Token inválido o revocado.')
+            payload = self.decode_token(token)
+            self.cache_payload(token_key, payload)
 
+        if self.is_stateless(payload):
+            return (self.get_token_user(payload), token)
+        return (await self.aget_user(str(payload['user_id'])), token)
+
+    def get_token(self, request):
+        auth_header = request.headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
             return None
+        return auth_header.split(' ')[1]
 
-        token = auth_header.split(' ')[1]
+    def cache_payload(self, token_key, payload):
+        token_cache.set(token_key, payload, ttl=payload['exp'] - time.time())
 
+    def is_stateless(self, payload):
+        return getattr(settings, 'JWT_STATELESS_AUTH', False) and \
+            all(claim in payload for claim in TOKEN_USER_CLAIMS)
+
+    def validate_token(self, token):
         if BlacklistedToken.is_blacklisted(token):
             raise AuthenticationFailed('Token inválido o revocado.')
+        return self.decode_token(token)
 
+    def decode_token(self, token):
         try:
             payload = jwt.decode(
                 token, settings.SECRET_KEY, algorithms=['HS256'])
-            user = User.objects.get(id=payload['user_id'])
-            return (user, token)
+            return payload
         except jwt.ExpiredSignatureError:
             raise AuthenticationFailed('Token expirado.')
         except jwt.InvalidTokenError:
             raise AuthenticationFailed('Token inválido.')
-        except User.DoesNotExist:
-            raise AuthenticationFailed('Usuario no encontrado.')
+
+    def get_user(self, user_id):
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = User.objects.get(id=user_id)
+            except User.DoesNotExist:
+                raise AuthenticationFailed('Usuario no encontrado.')
+            user_cache.set(user_id, user)
+        self.check_active(user)
+        # Cada petición recibe su propia copia de la instancia cacheada
+        return copy.copy(user)
+
+    async def aget_user(self, user_id):
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = await User.objects.aget(id=user_id)
+            except User.DoesNotExist:
+                raise AuthenticationFailed('Usuario no encontrado.')
+            user_cache.set(user_id, user)
+        self.check_active(user)
+        return copy.copy(user)
+
+    def check_active(self, user):
+        if not user.is_active:
+            raise AuthenticationFailed('Usuario inactivo.')
+
+    def get_token_user(self, payload):
+        """
+        Builds a User from the token claims without querying the database.
+        Any field not carried in the token is deferred, so it is loaded
+        only if a view actually reads it.
+        """
+        claims = dict(payload, id=int(payload['user_id']))
+        field_names = [field.attname for field in User._meta.concrete_fields
+                       if field.attname in claims]
+        return User.from_db(
+            router.db_for_read(User), field_names,
+            [claims[name] for name in field_names])
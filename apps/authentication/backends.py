@@ -0,0 +1,23 @@
+# apps/authentication/backends.py
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+UserModel = get_user_model()
+
+
+class EmailBackend(ModelBackend):
+    """Authenticates with ``authenticate(email=..., password=...)``."""
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get(email=email)
+        except UserModel.DoesNotExist:
+            # Mismo coste que con un usuario existente (evita enumerar correos)
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,144 @@
+# apps/authentication/bloom.py
+
+import hashlib
+import math
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre un bytearray. Nunca da falsos negativos; la tasa
+    de falsos positivos se mantiene en ``error_rate`` hasta ``capacity``
+    elementos.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.size = max(int(math.ceil(
+            -self.capacity * math.log(error_rate) / math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(
+            self.size / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+
+class RevokedTokenFilter:
+    """
+    Filtro de Bloom de los hashes de tokens revocados, delante de
+    BlacklistedToken. Se construye desde la tabla en el primer uso del
+    proceso, se sincroniza con las filas nuevas cada ``SYNC_INTERVAL``
+    segundos y se reconstruye por completo cada ``REBUILD_INTERVAL``.
+
+    Los ids no se confirman en orden (en PostgreSQL una transacción puede
+    obtener un id menor y hacer commit después), así que cada sincronización
+    vuelve a leer las últimas ``sync_overlap`` filas por debajo del último
+    id visto.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001,
+                 sync_interval=5, rebuild_interval=300, sync_overlap=1000):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.sync_overlap = sync_overlap
+        self._filter = None
+        self._last_id = 0
+        self._synced_at = 0
+        self._built_at = 0
+        self._lock = threading.Lock()
+
+    def might_contain(self, token_hash):
+        self._ensure_fresh()
+        return token_hash in self._filter
+
+    async def amight_contain(self, token_hash):
+        bloom = self._filter
+        if bloom is None or self.is_stale(time.monotonic()):
+            # Reconstruir o sincronizar lee la BD: fuera del event loop
+            await sync_to_async(self._ensure_fresh)()
+            bloom = self._filter
+        return token_hash in bloom
+
+    def is_stale(self, now):
+        return now - self._built_at > self.rebuild_interval or \
+            now - self._synced_at > self.sync_interval
+
+    def add(self, token_hash):
+        with self._lock:
+            if self._filter is None:
+                return
+            self._filter.add(token_hash)
+            if self._filter.count > self._filter.capacity:
+                self._filter = None
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._filter is None or now - self._built_at > self.rebuild_interval:
+                self._rebuild(now)
+            elif now - self._synced_at > self.sync_interval:
+                self._sync(self._filter, now)
+
+    def _rows(self, **filters):
+        from apps.authentication.models import BlacklistedToken
+
+        queryset = BlacklistedToken.objects.filter(
+            expires_at__gt=timezone.now(), **filters).order_by('id')
+        for pk, token_hash in queryset.values_list('id', 'token_hash').iterator():
+            yield pk, bytes(token_hash)
+
+    def _rebuild(self, now):
+        from apps.authentication.models import BlacklistedToken
+
+        live = BlacklistedToken.objects.filter(
+            expires_at__gt=timezone.now()).count()
+        bloom = BloomFilter(max(self.capacity, live * 2), self.error_rate)
+        self._last_id = 0
+        self._sync(bloom, now)
+        self._filter = bloom
+        self._built_at = now
+
+    def _sync(self, bloom, now):
+        for pk, token_hash in self._rows(id__gt=self._last_id - self.sync_overlap):
+            # Las filas de la ventana de solapamiento ya suelen estar
+            if token_hash not in bloom:
+                bloom.add(token_hash)
+            self._last_id = max(self._last_id, pk)
+        self._synced_at = now
+
+
+_config = getattr(settings, 'TOKEN_BLOOM_FILTER', {})
+
+revoked_tokens = RevokedTokenFilter(
+    capacity=_config.get('CAPACITY', 100000),
+    error_rate=_config.get('ERROR_RATE', 0.001),
+    sync_interval=_config.get('SYNC_INTERVAL', 5),
+    rebuild_interval=_config.get('REBUILD_INTERVAL', 300),
+    sync_overlap=_config.get('SYNC_OVERLAP', 1000),
+)
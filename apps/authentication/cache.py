@@ -0,0 +1,64 @@
+# apps/authentication/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class LRUCache:
+    """
+    Cache en memoria del proceso, acotada por número de entradas y con
+    expiración por entrada. Es segura entre hilos.
+    """
+
+    def __init__(self, max_entries=1000, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_config = getattr(settings, 'AUTH_CACHE', {})
+
+# hash del token -> id del usuario (token válido y no revocado)
+token_cache = LRUCache(
+    max_entries=_config.get('MAX_ENTRIES', 10000), ttl=_config.get('TTL', 60))
+
+# id del usuario -> instancia de User
+user_cache = LRUCache(
+    max_entries=_config.get('MAX_ENTRIES', 10000), ttl=_config.get('TTL', 60))
@@ -0,0 +1,20 @@
+# apps/authentication/exceptions.py
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from apps.authentication.hashers import HashPoolSaturated
+
+
+class HashServiceUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Servicio ocupado, inténtalo de nuevo en unos segundos.'
+    default_code = 'hash_pool_saturated'
+
+
+def exception_handler(exc, context):
+    # El pool de hashes lleno es una sobrecarga temporal, no un error (503)
+    if isinstance(exc, HashPoolSaturated):
+        exc = HashServiceUnavailable()
+    return drf_exception_handler(exc, context)
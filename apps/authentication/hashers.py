@@ -0,0 +1,92 @@
+# apps/authentication/hashers.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+# Política de hash de contraseñas. Los parámetros vienen de
+# settings.PASSWORD_HASHING y se calculan en cada host con
+# ``manage.py calibrate_password_hasher``. Un hash guardado con otros
+# parámetros se rehace al iniciar sesión (must_update de Django).
+
+def get_config():
+    return getattr(settings, 'PASSWORD_HASHING', {})
+
+
+class HashPoolSaturated(Exception):
+    """
+    No slot in the hash pool within POOL_TIMEOUT. The hasher also runs
+    outside DRF (admin, createsuperuser), so this is not an APIException:
+    the API's exception handler turns it into a 503.
+    """
+
+
+class HashPool:
+    """
+    Runs password hashes on at most ``workers`` threads, with at most
+    ``queue`` more waiting. A request that cannot get a slot within
+    ``timeout`` seconds fails with HashPoolSaturated (503) instead of
+    piling up CPU work behind the other logins.
+    """
+
+    def __init__(self, workers, queue, timeout):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._local = threading.local()
+
+    def run(self, func, *args):
+        # Un hash pedido desde un hilo del pool se ejecuta en el mismo hilo
+        if getattr(self._local, 'in_pool', False):
+            return func(*args)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HashPoolSaturated()
+        try:
+            return self._executor.submit(self._call, func, *args).result()
+        finally:
+            self._slots.release()
+
+    def _call(self, func, *args):
+        self._local.in_pool = True
+        try:
+            return func(*args)
+        finally:
+            self._local.in_pool = False
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hash_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = get_config()
+                _pool = HashPool(workers=config.get('POOL_WORKERS', 4),
+                                 queue=config.get('POOL_QUEUE', 16),
+                                 timeout=config.get('POOL_TIMEOUT', 2))
+    return _pool
+
+
+class CalibratedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the iteration count from
+    ``PASSWORD_HASHING['PBKDF2_ITERATIONS']``, hashing on the bounded pool.
+    It keeps Django's algorithm name, so existing hashes stay valid and
+    removing it from PASSWORD_HASHERS is safe. Django picks one hasher per
+    algorithm name, so Django's own PBKDF2PasswordHasher must not be listed
+    as well: it would take over check_password, outside the pool.
+    """
+
+    @property
+    def iterations(self):
+        return get_config().get('PBKDF2_ITERATIONS') or PBKDF2PasswordHasher.iterations
+
+    def encode(self, password, salt, iterations=None):
+        return get_hash_pool().run(super().encode, password, salt, iterations)
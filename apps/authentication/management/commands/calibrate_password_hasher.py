@@ -0,0 +1,52 @@
+# apps/authentication/management/commands/calibrate_password_hasher.py
+
+import time
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand
+
+from apps.authentication.hashers import get_config
+
+
+class Command(BaseCommand):
+    help = ('Measures PBKDF2 on this host and prints the iteration count that '
+            'meets a target hash latency, for PASSWORD_HASHING["PBKDF2_ITERATIONS"].')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=100,
+                            help='Target time for one hash, in milliseconds (default: 100).')
+        parser.add_argument('--samples', type=int, default=5,
+                            help='Timed hashes per measurement; the fastest counts.')
+        parser.add_argument('--min-iterations', type=int, default=100000,
+                            help='Never suggest fewer iterations than this.')
+
+    def handle(self, *args, **options):
+        # Se mide el hasher de Django sin el pool para no contar la espera
+        hasher = PBKDF2PasswordHasher()
+        salt = hasher.salt()
+        probe = 100000
+
+        per_iteration = self.measure(hasher, salt, probe, options['samples']) / probe
+        iterations = int(options['target_ms'] / 1000 / per_iteration)
+        iterations = max(iterations, options['min_iterations'])
+        # Redondeo a miles para que el valor sea estable entre ejecuciones
+        iterations = round(iterations, -3)
+        measured = self.measure(hasher, salt, iterations, options['samples'])
+
+        current = get_config().get('PBKDF2_ITERATIONS') or PBKDF2PasswordHasher.iterations
+        current_ms = per_iteration * current * 1000
+        self.stdout.write(f'Current: {current} iterations (~{current_ms:.0f} ms per hash)')
+        self.stdout.write(f'Suggested: {iterations} iterations ({measured * 1000:.0f} ms per hash)')
+        if iterations < PBKDF2PasswordHasher.iterations:
+            self.stdout.write(self.style.WARNING(
+                f'Below Django\'s default of {PBKDF2PasswordHasher.iterations}: '
+                'cheaper logins, weaker protection of stolen hashes.'))
+        self.stdout.write(f"\nPASSWORD_HASHING['PBKDF2_ITERATIONS'] = {iterations}")
+
+    def measure(self, hasher, salt, iterations, samples):
+        timings = []
+        for _ in range(max(samples, 1)):
+            started = time.perf_counter()
+            hasher.encode('calibration-password', salt, iterations)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
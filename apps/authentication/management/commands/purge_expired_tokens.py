@@ -0,0 +1,59 @@
+# apps/authentication/management/commands/purge_expired_tokens.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.authentication.models import (
+    AuthToken, BlacklistedToken, EmailVerification, OutboxEmail, PasswordResetToken
+)
+
+
+MODELS = (AuthToken, BlacklistedToken, PasswordResetToken, EmailVerification,
+          OutboxEmail)
+
+
+class Command(BaseCommand):
+    help = ('Deletes expired auth tokens, blacklisted tokens, reset/verification tokens '
+            'and old sent emails in batches.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows deleted per transaction (default: 500).')
+        parser.add_argument('--pause', type=float, default=0.05,
+                            help='Seconds to sleep between batches so writers are not blocked.')
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Run forever, purging every N seconds (scheduler mode).')
+
+    def handle(self, *args, **options):
+        while True:
+            self.purge(options['batch_size'], options['pause'])
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def purge(self, batch_size, pause):
+        now = timezone.now()
+        for model in MODELS:
+            started = time.perf_counter()
+            removed = 0
+            while True:
+                pks = list(model.expired(now).order_by().values_list(
+                    'pk', flat=True)[:batch_size])
+                if not pks:
+                    break
+                # Transacciones cortas: en SQLite el bloqueo de escritura
+                # se libera entre lotes.
+                with transaction.atomic():
+                    model.objects.filter(pk__in=pks).delete()
+                removed += len(pks)
+                if len(pks) < batch_size:
+                    break
+                if pause:
+                    time.sleep(pause)
+
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{model._meta.label}: {removed} rows removed in {elapsed:.2f}s')
@@ -0,0 +1,101 @@
+# apps/authentication/management/commands/send_queued_emails.py
+
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.authentication.models import OutboxEmail
+from apps.authentication.utils import build_email_message
+
+
+def send_batch(emails):
+    """
+    Sends ``emails`` over a single SMTP connection. Returns (sent ids,
+    {id: error}); a failing message does not stop the rest of the batch.
+    """
+    sent, errors = [], {}
+    try:
+        connection = get_connection(fail_silently=False)
+        connection.open()
+    except Exception as exc:
+        return sent, {email.pk: repr(exc) for email in emails}
+    try:
+        for email in emails:
+            try:
+                build_email_message(email, connection=connection).send()
+                sent.append(email.pk)
+            except Exception as exc:
+                errors[email.pk] = repr(exc)
+    finally:
+        connection.close()
+    return sent, errors
+
+
+class Command(BaseCommand):
+    help = 'Sends the queued emails (OutboxEmail) with a thread pool, one SMTP connection per batch.'
+
+    def add_arguments(self, parser):
+        config = getattr(settings, 'EMAIL_OUTBOX', {})
+        parser.add_argument('--batch-size', type=int, default=config.get('BATCH_SIZE', 50),
+                            help='Emails sent over one SMTP connection.')
+        parser.add_argument('--workers', type=int, default=config.get('WORKERS', 4),
+                            help='Batches sent in parallel.')
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Run forever, polling the queue every N seconds.')
+
+    def handle(self, *args, **options):
+        config = getattr(settings, 'EMAIL_OUTBOX', {})
+        self.max_attempts = config.get('MAX_ATTEMPTS', 5)
+        self.backoff = config.get('BACKOFF_SECONDS', 30)
+        self.max_backoff = config.get('MAX_BACKOFF_SECONDS', 3600)
+        self.lease = datetime.timedelta(seconds=config.get('LEASE_SECONDS', 300))
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                drained = self.drain(pool, options['batch_size'], options['workers'])
+                if not options['interval']:
+                    break
+                if not drained:
+                    time.sleep(options['interval'])
+
+    def drain(self, pool, batch_size, workers):
+        total = 0
+        while True:
+            emails = OutboxEmail.claim(batch_size * workers, self.lease)
+            if not emails:
+                return total
+            # Los hilos solo hablan con el servidor SMTP; la BD se actualiza
+            # desde este hilo.
+            batches = [emails[i:i + batch_size]
+                       for i in range(0, len(emails), batch_size)]
+            sent, errors = [], {}
+            for batch_sent, batch_errors in pool.map(send_batch, batches):
+                sent += batch_sent
+                errors.update(batch_errors)
+
+            self.mark_sent(sent)
+            self.mark_failed([email for email in emails if email.pk in errors], errors)
+            total += len(emails)
+            self.stdout.write(f'{len(sent)} sent, {len(errors)} failed')
+
+    def mark_sent(self, ids):
+        if ids:
+            OutboxEmail.objects.filter(pk__in=ids).update(
+                status='sent', sent_at=timezone.now(), claim_token=None, last_error='')
+
+    def mark_failed(self, emails, errors):
+        now = timezone.now()
+        for email in emails:
+            if email.attempts >= self.max_attempts:
+                status, next_attempt_at = 'failed', now
+            else:
+                delay = min(self.backoff * 2 ** (email.attempts - 1), self.max_backoff)
+                status, next_attempt_at = 'pending', now + datetime.timedelta(seconds=delay)
+            OutboxEmail.objects.filter(pk=email.pk).update(
+                status=status, next_attempt_at=next_attempt_at,
+                claim_token=None, last_error=errors[email.pk])
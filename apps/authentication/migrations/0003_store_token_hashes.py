@@ -0,0 +1,87 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_tokens(apps, schema_editor):
+    AuthToken = apps.get_model('authentication', 'AuthToken')
+    BlacklistedToken = apps.get_model('authentication', 'BlacklistedToken')
+
+    def digest(token):
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    tokens = []
+    for token in AuthToken.objects.only('access_token', 'refresh_token').iterator():
+        token.access_token_hash = digest(token.access_token)
+        token.refresh_token_hash = digest(token.refresh_token)
+        tokens.append(token)
+    AuthToken.objects.bulk_update(
+        tokens, ['access_token_hash', 'refresh_token_hash'], batch_size=500)
+
+    blacklisted = []
+    for token in BlacklistedToken.objects.only('token').iterator():
+        token.token_hash = digest(token.token)
+        blacklisted.append(token)
+    BlacklistedToken.objects.bulk_update(
+        blacklisted, ['token_hash'], batch_size=500)
+
+
+def delete_unrecoverable_tokens(apps, schema_editor):
+    # Del hash no se puede recuperar el token en claro: al deshacer la
+    # migración se borran las sesiones y la lista negra (caducan igualmente)
+    apps.get_model('authentication', 'AuthToken').objects.all().delete()
+    apps.get_model('authentication', 'BlacklistedToken').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_emailverification_passwordresettoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authtoken',
+            name='access_token_hash',
+            field=models.BinaryField(max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='authtoken',
+            name='refresh_token_hash',
+            field=models.BinaryField(max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='blacklistedtoken',
+            name='token_hash',
+            field=models.BinaryField(max_length=32, null=True),
+        ),
+        migrations.RunPython(hash_existing_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='authtoken',
+            name='access_token',
+        ),
+        migrations.RemoveField(
+            model_name='authtoken',
+            name='refresh_token',
+        ),
+        migrations.RemoveField(
+            model_name='blacklistedtoken',
+            name='token',
+        ),
+        migrations.RunPython(migrations.RunPython.noop, delete_unrecoverable_tokens),
+        migrations.AlterField(
+            model_name='authtoken',
+            name='access_token_hash',
+            field=models.BinaryField(max_length=32, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='authtoken',
+            name='refresh_token_hash',
+            field=models.BinaryField(max_length=32, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='blacklistedtoken',
+            name='token_hash',
+            field=models.BinaryField(max_length=32, unique=True),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:28
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+from django.utils import timezone
+
+
+def drop_duplicate_tokens(apps, schema_editor):
+    # Se conserva la sesión más reciente de cada usuario; las demás se
+    # revocan (sus access tokens pueden seguir vigentes) y se borran.
+    AuthToken = apps.get_model('authentication', 'AuthToken')
+    BlacklistedToken = apps.get_model('authentication', 'BlacklistedToken')
+
+    duplicated = AuthToken.objects.values('user').annotate(
+        total=Count('id'), keep=Max('id')).filter(total__gt=1)
+    keep = {row['user']: row['keep'] for row in duplicated}
+    if not keep:
+        return
+
+    stale = AuthToken.objects.filter(user__in=keep).exclude(id__in=keep.values())
+    now = timezone.now()
+    blacklisted = []
+    for token in stale.filter(expires_at__gt=now).iterator():
+        for token_hash in (token.access_token_hash, token.refresh_token_hash):
+            blacklisted.append(BlacklistedToken(
+                token_hash=bytes(token_hash), expires_at=token.expires_at))
+    BlacklistedToken.objects.bulk_create(
+        blacklisted, batch_size=500, ignore_conflicts=True)
+    stale.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_outbox_email'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_tokens, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='authtoken',
+            constraint=models.UniqueConstraint(fields=('user',), name='authtoken_one_per_user'),
+        ),
+    ]
@@ -1,42 +1,145 @@
 # apps/authentication/models.py
 
-from django.db import models
+from django.db import models, router, transaction
 from django.conf import settings
 from django.utils import timezone
 import datetime
 import uuid
 
+from apps.authentication.bloom import revoked_tokens
+from apps.authentication.cache import token_cache
+from apps.authentication.utils import hash_token
+
+EMAIL_VERIFICATION_TTL = datetime.timedelta(days=1)
+PASSWORD_RESET_TTL = datetime.timedelta(hours=24)
+# Tiempo que se conservan los correos ya enviados de la cola
+OUTBOX_RETENTION = datetime.timedelta(days=7)
+
 
 class AuthToken(models.Model):
+    """
+    Sesión activa del usuario: una fila por usuario. Iniciar sesión o
+    refrescar sustituye los hashes de la fila y revoca los tokens
+    anteriores.
+    """
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL,
                              on_delete=models.CASCADE)
-    access_token = models.TextField(unique=True)
-    refresh_token = models.TextField(unique=True)
-    expires_at = models.DateTimeField()
+    # SHA-256 de los tokens; nunca se guardan los tokens en claro
+    access_token_hash = models.BinaryField(max_length=32, unique=True)
+    refresh_token_hash = models.BinaryField(max_length=32, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user'], name='authtoken_one_per_user'),
+        ]
+
     def is_valid(self):
         return timezone.now() < self.expires_at
 
     @classmethod
-    def get_active_token(cls, user):
-        return cls.objects.filter(user=user, expires_at__gt=timezone.now()).first()
+    def expired(cls, now=None):
+        return cls.objects.filter(expires_at__lte=now or timezone.now())
+
+    @classmethod
+    def issue(cls, user, access_token, refresh_token, expires_at):
+        """
+        Starts a new session for ``user``, revoking the current one. Three
+        statements in one transaction: lock and read the current row,
+        blacklist its tokens, upsert the new hashes.
+        """
+        now = timezone.now()
+        with transaction.atomic(using=router.db_for_write(cls)):
+            current = cls.objects.select_for_update().filter(
+                user=user, expires_at__gt=now).values_list(
+                'access_token_hash', 'refresh_token_hash', 'expires_at').first()
+            if current:
+                BlacklistedToken.blacklist(current[:2], current[2])
+            cls.objects.bulk_create(
+                [cls(user=user,
+                     access_token_hash=hash_token(access_token),
+                     refresh_token_hash=hash_token(refresh_token),
+                     expires_at=expires_at)],
+                update_conflicts=True, unique_fields=['user'],
+                update_fields=['access_token_hash', 'refresh_token_hash',
+                               'expires_at', 'created_at'])
+
+    @classmethod
+    def get_by_refresh_token(cls, refresh_token):
+        # Un refresh token revocado o ya rotado no tiene fila
+        return cls.objects.select_related('user').filter(
+            refresh_token_hash=hash_token(refresh_token),
+            expires_at__gt=timezone.now()).first()
+
+    @classmethod
+    def get_by_access_token(cls, access_token, user):
+        return cls.objects.filter(
+            access_token_hash=hash_token(access_token), user=user).first()
+
+    def rotate(self, access_token, refresh_token, expires_at):
+        """
+        Replaces the tokens of this session if nobody rotated them since it
+        was read (compare-and-swap on the refresh hash) and blacklists the
+        old ones. Returns False when a concurrent refresh won.
+        """
+        old_hashes = (bytes(self.access_token_hash), bytes(self.refresh_token_hash))
+        new_hashes = (hash_token(access_token), hash_token(refresh_token))
+        with transaction.atomic(using=router.db_for_write(type(self))):
+            swapped = type(self).objects.filter(
+                pk=self.pk, refresh_token_hash=old_hashes[1]).update(
+                access_token_hash=new_hashes[0], refresh_token_hash=new_hashes[1],
+                expires_at=expires_at, created_at=timezone.now())
+            if not swapped:
+                return False
+            BlacklistedToken.blacklist(old_hashes, self.expires_at)
+        self.access_token_hash, self.refresh_token_hash = new_hashes
+        self.expires_at = expires_at
+        return True
 
     def revoke(self):
-        BlacklistedToken.objects.create(
-            token=self.refresh_token,
-            expires_at=self.expires_at
-        )
-        self.delete()
+        # Se revocan ambos tokens para que el access token deje de valer
+        with transaction.atomic(using=router.db_for_write(type(self))):
+            BlacklistedToken.blacklist(
+                (self.access_token_hash, self.refresh_token_hash), self.expires_at)
+            self.delete()
 
 
 class BlacklistedToken(models.Model):
-    token = models.TextField(unique=True)
-    expires_at = models.DateTimeField()
+    token_hash = models.BinaryField(max_length=32, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    @classmethod
+    def expired(cls, now=None):
+        return cls.objects.filter(expires_at__lte=now or timezone.now())
+
+    @classmethod
+    def blacklist(cls, token_hashes, expires_at):
+        """Blacklists ``token_hashes`` with a single INSERT."""
+        token_hashes = [bytes(token_hash) for token_hash in token_hashes]
+        cls.objects.bulk_create(
+            [cls(token_hash=token_hash, expires_at=expires_at)
+             for token_hash in token_hashes],
+            ignore_conflicts=True)
+        for token_hash in token_hashes:
+            revoked_tokens.add(token_hash)
+            token_cache.delete(token_hash)
 
     @classmethod
     def is_blacklisted(cls, token):
-        return cls.objects.filter(token=token, expires_at__gt=timezone.now()).exists()
+        token_hash = hash_token(token)
+        # Solo los posibles positivos del filtro de Bloom llegan a la BD
+        if not revoked_tokens.might_contain(token_hash):
+            return False
+        return cls.objects.filter(token_hash=token_hash, expires_at__gt=timezone.now()).exists()
+
+    @classmethod
+    async def ais_blacklisted(cls, token):
+        token_hash = hash_token(token)
+        if not await revoked_tokens.amight_contain(token_hash):
+            return False
+        return await cls.objects.filter(token_hash=token_hash, expires_at__gt=timezone.now()).aexists()
 
 
 # apps/authentication/models.py
@@ -46,20 +149,95 @@ class EmailVerification(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     token = models.CharField(max_length=255, default=uuid.uuid4)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     is_verified = models.BooleanField(default=False)
 
     def is_valid(self):
         # Token válido 24 horas
-        return (timezone.now() - self.created_at).days < 1
+        return timezone.now() - self.created_at < EMAIL_VERIFICATION_TTL
+
+    @classmethod
+    def expired(cls, now=None):
+        now = now or timezone.now()
+        return cls.objects.filter(created_at__lte=now - EMAIL_VERIFICATION_TTL)
 
 
 class PasswordResetToken(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL,
                              on_delete=models.CASCADE)
     token = models.CharField(max_length=255, default=uuid.uuid4)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def is_valid(self):
         # Token válido 24 horas
-        return (timezone.now() - self.created_at).hours < 24
+        return timezone.now() - self.created_at < PASSWORD_RESET_TTL
+
+    @classmethod
+    def expired(cls, now=None):
+        now = now or timezone.now()
+        return cls.objects.filter(created_at__lte=now - PASSWORD_RESET_TTL)
+
+
+class OutboxEmail(models.Model):
+    """
+    Correo pendiente de envío. Las vistas solo insertan la fila; el comando
+    ``send_queued_emails`` renderiza la plantilla y lo envía.
+    """
+
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    template_name = models.CharField(max_length=255)
+    context = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Próximo intento; mientras un worker lo envía sirve de lease
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.UUIDField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'],
+                         name='outbox_status_next_idx'),
+            models.Index(fields=['claim_token'], name='outbox_claim_idx'),
+        ]
+
+    @classmethod
+    def enqueue(cls, to_email, subject, template_name, context):
+        return cls.objects.create(
+            to_email=to_email, subject=subject,
+            template_name=template_name, context=context)
+
+    @classmethod
+    def claim(cls, batch_size, lease):
+        """
+        Reserves up to ``batch_size`` due emails for this worker and returns
+        them. A worker that dies leaves them to be retried when the lease
+        expires.
+        """
+        now = timezone.now()
+        token = uuid.uuid4()
+        due = cls.objects.filter(
+            status='pending', next_attempt_at__lte=now).order_by('next_attempt_at')
+        ids = list(due.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return []
+        # El filtro repetido evita reservar filas que otro worker ya tomó
+        cls.objects.filter(pk__in=ids, status='pending', next_attempt_at__lte=now).update(
+            claim_token=token, next_attempt_at=now + lease,
+            attempts=models.F('attempts') + 1)
+        return list(cls.objects.filter(claim_token=token))
+
+    @classmethod
+    def expired(cls, now=None):
+        now = now or timezone.now()
+        return cls.objects.filter(status='sent', sent_at__lte=now - OUTBOX_RETENTION)
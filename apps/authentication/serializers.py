@@ -10,7 +10,9 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True)
 
     def validate(self, data):
-        user = authenticate(email=data['email'], password=data['password'])
+        # EmailBackend; si el hash usa otros parámetros se actualiza aquí
+        user = authenticate(self.context.get('request'),
+                            email=data['email'], password=data['password'])
         if user and user.is_active:
             return user
         raise serializers.ValidationError("Credenciales incorrectas")
@@ -28,7 +30,9 @@ class RegisterSerializer(serializers.ModelSerializer):
         fields = ['email', 'password', 'first_name', 'last_name']
 
     def create(self, validated_data):
-        user = User.objects.create_user(**validated_data)
+        # El modelo exige username; se usa el correo, que ya es único
+        user = User.objects.create_user(
+            username=validated_data['email'], **validated_data)
         return user
 
 
@@ -1,3 +1,477 @@
-from django.test import TestCase
+import datetime
+import io
+import threading
+from unittest import mock
+from smtplib import SMTPException
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.db.migrations.executor import MigrationExecutor
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+
+from apps.authentication.authentication import JWTAuthentication
+from apps.authentication.bloom import BloomFilter, RevokedTokenFilter, revoked_tokens
+from apps.authentication.cache import token_cache, user_cache
+from apps.authentication.hashers import HashPool, HashPoolSaturated
+from apps.authentication.models import AuthToken, BlacklistedToken, OutboxEmail
+from apps.authentication.utils import generate_access_token, generate_refresh_token, hash_token
+from apps.users.models import User
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise SMTPException('connection refused')
+
+
+@override_settings(EMAIL_OUTBOX={'BATCH_SIZE': 10, 'WORKERS': 2, 'MAX_ATTEMPTS': 2,
+                                 'BACKOFF_SECONDS': 30, 'MAX_BACKOFF_SECONDS': 3600,
+                                 'LEASE_SECONDS': 300})
+class EmailOutboxTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='ana', email='ana@example.com', password='secret-pass',
+            first_name='Ana', last_name='Pérez')
+
+    def call_worker(self):
+        call_command('send_queued_emails', stdout=io.StringIO())
+
+    def test_requests_only_enqueue(self):
+        response = self.client.post(reverse('auth-forgot-password'),
+                                    {'email': 'ana@example.com'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(reverse('auth-register'), {
+            'email': 'luis@example.com', 'password': 'secret-pass',
+            'first_name': 'Luis', 'last_name': 'Gómez'}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.filter(status='pending').count(), 2)
+
+    def test_worker_sends_queued_emails(self):
+        self.client.post(reverse('auth-forgot-password'),
+                         {'email': 'ana@example.com'}, format='json')
+        self.call_worker()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['ana@example.com'])
+        self.assertIn('/reset-password/?token=', mail.outbox[0].body)
+        self.assertEqual(OutboxEmail.objects.get().status, 'sent')
+
+        self.call_worker()
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_BACKEND='apps.authentication.tests.FailingEmailBackend')
+    def test_failures_back_off_then_give_up(self):
+        self.client.post(reverse('auth-forgot-password'),
+                         {'email': 'ana@example.com'}, format='json')
+        self.call_worker()
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertIn('connection refused', email.last_error)
+        self.assertGreater(email.next_attempt_at,
+                           timezone.now() + datetime.timedelta(seconds=25))
+
+        # No se reintenta antes de tiempo
+        self.call_worker()
+        self.assertEqual(OutboxEmail.objects.get().attempts, 1)
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        self.call_worker()
+        email = OutboxEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), ('failed', 2))
+
+
+@override_settings(PASSWORD_HASHING={'PBKDF2_ITERATIONS': 1000})
+class PasswordHashingTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='ana', email='ana@example.com', password='secret-pass')
+
+    def login(self, password='secret-pass'):
+        return self.client.post(reverse('auth-login'), {
+            'email': 'ana@example.com', 'password': password}, format='json')
+
+    def test_login_with_email(self):
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access_token', response.data)
+        self.assertEqual(self.login('wrong').status_code, 400)
+
+    def test_login_upgrades_hash(self):
+        with self.settings(PASSWORD_HASHING={'PBKDF2_ITERATIONS': 2000}):
+            self.assertEqual(self.login('wrong').status_code, 400)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+            self.assertEqual(self.login().status_code, 200)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+            self.assertTrue(self.user.check_password('secret-pass'))
+
+    def test_login_checks_password_on_the_pool(self):
+        with mock.patch.object(HashPool, 'run', autospec=True,
+                               side_effect=HashPool.run) as run:
+            self.assertEqual(self.login().status_code, 200)
+            self.assertEqual(run.call_count, 1)
+            self.assertEqual(self.login('wrong').status_code, 400)
+            self.assertEqual(run.call_count, 2)
+
+    def test_saturated_pool_is_503_on_the_api(self):
+        with mock.patch.object(HashPool, 'run', side_effect=HashPoolSaturated):
+            response = self.login()
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.json()['detail'],
+                             'Servicio ocupado, inténtalo de nuevo en unos segundos.')
+            # Fuera de DRF la excepción no es una APIException
+            with self.assertRaises(HashPoolSaturated):
+                make_password('secret-pass')
+
+    def test_pool_rejects_when_saturated(self):
+        pool = HashPool(workers=1, queue=0, timeout=0.05)
+        started, release = threading.Event(), threading.Event()
+
+        def slow_hash():
+            started.set()
+            release.wait()
+            return 'done'
+
+        results = []
+        worker = threading.Thread(target=lambda: results.append(pool.run(slow_hash)))
+        worker.start()
+        started.wait()
+        with self.assertRaises(HashPoolSaturated):
+            pool.run(str, 'x')
+        release.set()
+        worker.join()
+        self.assertEqual(results, ['done'])
+        self.assertEqual(pool.run(str, 'x'), 'x')
+
+
+@override_settings(PASSWORD_HASHING={'PBKDF2_ITERATIONS': 1000})
+class TokenRotationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='ana', email='ana@example.com', password='secret-pass')
+        self.tokens = self.login()
+
+    def login(self):
+        response = self.client.post(reverse('auth-login'), {
+            'email': 'ana@example.com', 'password': 'secret-pass'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def refresh(self, refresh_token):
+        return self.client.post(reverse('auth-refresh'), {
+            'refresh_token': refresh_token}, format='json')
+
+    def assertRevoked(self, tokens):
+        for token in (tokens['access_token'], tokens['refresh_token']):
+            self.assertTrue(BlacklistedToken.is_blacklisted(token))
+
+    def test_issue_queries(self):
+        # SELECT ... FOR UPDATE, INSERT en la lista negra y upsert, más el
+        # SAVEPOINT/RELEASE de la transacción
+        with self.assertNumQueries(5):
+            AuthToken.issue(self.user, 'access', 'refresh', timezone.now() + datetime.timedelta(days=7))
+        self.assertRevoked(self.tokens)
+        token = AuthToken.objects.get()
+        self.assertEqual(bytes(token.refresh_token_hash), hash_token('refresh'))
+
+    def test_login_replaces_session(self):
+        # Búsqueda del usuario + 5 de AuthToken.issue
+        with self.assertNumQueries(6):
+            tokens = self.login()
+        self.assertRevoked(self.tokens)
+        self.assertEqual(AuthToken.objects.filter(user=self.user).count(), 1)
+
+        response = self.client.get(reverse('tasks-stats'),
+                                   HTTP_AUTHORIZATION=f"Bearer {self.tokens['access_token']}")
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(reverse('tasks-stats'),
+                                   HTTP_AUTHORIZATION=f"Bearer {tokens['access_token']}")
+        self.assertEqual(response.status_code, 200)
+
+    def test_refresh_rotates_tokens(self):
+        # SELECT con el usuario, UPDATE condicional, INSERT en la lista
+        # negra y SAVEPOINT/RELEASE
+        with self.assertNumQueries(5):
+            response = self.refresh(self.tokens['refresh_token'])
+        self.assertEqual(response.status_code, 200)
+        self.assertRevoked(self.tokens)
+        token = AuthToken.objects.get()
+        self.assertEqual(bytes(token.refresh_token_hash),
+                         hash_token(response.data['refresh_token']))
+
+        # El refresh token antiguo ya no sirve
+        self.assertEqual(self.refresh(self.tokens['refresh_token']).status_code, 401)
+        self.assertEqual(self.refresh(response.data['refresh_token']).status_code, 200)
+
+    def test_concurrent_refresh_loses(self):
+        token = AuthToken.get_by_refresh_token(self.tokens['refresh_token'])
+        stale = AuthToken.get_by_refresh_token(self.tokens['refresh_token'])
+        expires_at = timezone.now() + datetime.timedelta(days=7)
+        self.assertTrue(token.rotate('access-1', 'refresh-1', expires_at))
+        self.assertFalse(stale.rotate('access-2', 'refresh-2', expires_at))
+        self.assertEqual(bytes(AuthToken.objects.get().refresh_token_hash),
+                         hash_token('refresh-1'))
+
+
+class AuthCacheTests(TestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        user_cache.clear()
+        revoked_tokens.reset()
+        self.user = User.objects.create_user(username='ana', email='ana@example.com')
+        self.token = generate_access_token(self.user)
+        AuthToken.issue(self.user, self.token, generate_refresh_token(),
+                        timezone.now() + datetime.timedelta(days=7))
+
+    def authenticate(self, token=None):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token or self.token}')
+        return JWTAuthentication().authenticate(request)
+
+    def test_reused_token_costs_no_queries(self):
+        user, _token = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+        with self.assertNumQueries(0):
+            user, _token = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_revoked_token_is_rejected_at_once(self):
+        self.authenticate()
+        AuthToken.objects.get(user=self.user).revoke()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deactivated_user_is_rejected_at_once(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_user_changes_are_seen_at_once(self):
+        self.authenticate()
+        self.user.first_name = 'Otra'
+        self.user.save()
+        user, _token = self.authenticate()
+        self.assertEqual(user.first_name, 'Otra')
+
+
+class BloomFilterTests(TestCase):
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        keys = [hash_token(f'token-{i}') for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        self.assertEqual(bloom.count, 1000)
+
+    def test_false_positive_rate_within_bound(self):
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(hash_token(f'token-{i}'))
+        false_positives = sum(hash_token(f'other-{i}') in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class RevokedTokenFilterTests(TestCase):
+
+    def setUp(self):
+        self.expires_at = timezone.now() + datetime.timedelta(days=1)
+        self.filter = RevokedTokenFilter(capacity=100, sync_interval=0, sync_overlap=10)
+
+    def blacklist(self, token, **kwargs):
+        return BlacklistedToken.objects.create(
+            token_hash=hash_token(token), expires_at=self.expires_at, **kwargs)
+
+    def test_builds_from_table_and_ignores_expired_rows(self):
+        self.blacklist('revoked')
+        BlacklistedToken.objects.create(token_hash=hash_token('expired'),
+                                        expires_at=timezone.now() - datetime.timedelta(seconds=1))
+        self.assertTrue(self.filter.might_contain(hash_token('revoked')))
+        self.assertFalse(self.filter.might_contain(hash_token('expired')))
+        self.assertFalse(self.filter.might_contain(hash_token('valid')))
+
+    def test_sync_picks_up_new_rows(self):
+        self.assertFalse(self.filter.might_contain(hash_token('later')))
+        self.blacklist('later')
+        self.assertTrue(self.filter.might_contain(hash_token('later')))
+
+    def test_sync_rereads_rows_committed_out_of_id_order(self):
+        self.blacklist('high', id=50)
+        self.assertTrue(self.filter.might_contain(hash_token('high')))
+        # Una transacción con un id menor hace commit después de la sincronización
+        self.blacklist('low', id=45)
+        self.assertTrue(self.filter.might_contain(hash_token('low')))
+
+    def test_overlap_does_not_count_rows_twice(self):
+        self.blacklist('one')
+        self.filter.might_contain(b'x')
+        self.filter.might_contain(b'x')
+        self.assertEqual(self.filter._filter.count, 1)
+
+    def test_add_before_build_is_ignored(self):
+        self.filter.add(hash_token('unknown'))
+        self.assertIsNone(self.filter._filter)
+
+    def test_overflow_forces_rebuild(self):
+        self.filter.might_contain(b'x')
+        for i in range(101):
+            self.filter.add(hash_token(f'token-{i}'))
+        self.assertIsNone(self.filter._filter)
+
+
+class StoreTokenHashesMigrationTests(TransactionTestCase):
+    migrate_from = [('authentication', '0002_emailverification_passwordresettoken')]
+    migrate_to = [('authentication', '0006_one_token_per_user')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_existing_tokens_survive_the_upgrade(self):
+        token_cache.clear()
+        user_cache.clear()
+        revoked_tokens.reset()
+        user = User.objects.create_user(username='ana', email='ana@example.com')
+        access, refresh = generate_access_token(user), generate_refresh_token()
+        revoked = 'revoked-token'
+        expires_at = timezone.now() + datetime.timedelta(days=7)
+
+        old_apps = self.migrate(self.migrate_from)
+        old_apps.get_model('authentication', 'AuthToken').objects.create(
+            user_id=user.pk, access_token=access, refresh_token=refresh, expires_at=expires_at)
+        old_apps.get_model('authentication', 'BlacklistedToken').objects.create(
+            token=revoked, expires_at=expires_at)
+
+        self.migrate(self.migrate_to)
+
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        authenticated, _token = JWTAuthentication().authenticate(request)
+        self.assertEqual(authenticated.pk, user.pk)
+        self.assertEqual(AuthToken.get_by_refresh_token(refresh).user, user)
+        self.assertTrue(BlacklistedToken.is_blacklisted(revoked))
+
+    def test_rollback_drops_the_unrecoverable_tokens(self):
+        user = User.objects.create_user(username='ana', email='ana@example.com')
+        expires_at = timezone.now() + datetime.timedelta(days=7)
+        # La segunda sesión manda los tokens de la primera a la lista negra
+        for _ in range(2):
+            AuthToken.issue(user, generate_access_token(user), generate_refresh_token(), expires_at)
+        self.assertTrue(BlacklistedToken.objects.exists())
+
+        old_apps = self.migrate(self.migrate_from)
+        self.assertFalse(old_apps.get_model('authentication', 'AuthToken').objects.exists())
+        self.assertFalse(old_apps.get_model('authentication', 'BlacklistedToken').objects.exists())
+
+        self.migrate(self.migrate_to)
+
+
+class PurgeExpiredTokensTests(TestCase):
+
+    def setUp(self):
+        now = timezone.now()
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token_hash=hash_token(f'expired-{i}'),
+                              expires_at=now - datetime.timedelta(minutes=1))
+             for i in range(7)] +
+            [BlacklistedToken(token_hash=hash_token(f'live-{i}'),
+                              expires_at=now + datetime.timedelta(minutes=15))
+             for i in range(2)])
+
+    def purge(self, *args):
+        stdout = io.StringIO()
+        with mock.patch('apps.authentication.management.commands.'
+                        'purge_expired_tokens.time.sleep') as sleep:
+            with CaptureQueriesContext(connection) as queries:
+                call_command('purge_expired_tokens', *args, stdout=stdout)
+        deletes = [query['sql'] for query in queries.captured_queries
+                   if query['sql'].startswith('DELETE') and 'blacklistedtoken' in query['sql']]
+        return stdout.getvalue(), deletes, sleep
+
+    def test_deletes_expired_rows_in_batches(self):
+        output, deletes, sleep = self.purge('--batch-size', '3', '--pause', '0.5')
+        self.assertEqual(BlacklistedToken.objects.count(), 2)
+        self.assertFalse(BlacklistedToken.expired().exists())
+        # 3 + 3 + 1: el último lote incompleto termina sin pausa
+        self.assertEqual(len(deletes), 3)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertIn('authentication.BlacklistedToken: 7 rows removed', output)
+
+    def test_exact_multiple_needs_one_more_empty_batch(self):
+        _output, deletes, _sleep = self.purge('--batch-size', '7', '--pause', '0')
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(BlacklistedToken.objects.count(), 2)
+
+    def test_nothing_to_purge(self):
+        self.purge()
+        output, deletes, sleep = self.purge()
+        self.assertEqual(deletes, [])
+        sleep.assert_not_called()
+        self.assertIn('authentication.BlacklistedToken: 0 rows removed', output)
+
+
+@override_settings(JWT_STATELESS_AUTH=True)
+class StatelessAuthTests(TestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        user_cache.clear()
+        revoked_tokens.reset()
+        self.user = User.objects.create_user(username='ana', email='ana@example.com',
+                                             first_name='Ana', is_staff=True)
+        self.token = generate_access_token(self.user)
+        # El filtro de Bloom se construye una vez por proceso
+        revoked_tokens.might_contain(b'')
+
+    def authenticate(self, token=None):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token or self.token}')
+        return JWTAuthentication().authenticate(request)
+
+    def test_user_is_built_from_claims_without_queries(self):
+        with self.assertNumQueries(0):
+            user, _token = self.authenticate()
+            self.assertEqual((user.pk, user.username, user.first_name, user.is_staff),
+                             (self.user.pk, 'ana', 'Ana', True))
+        # Los campos que no viajan en el token se cargan al leerlos
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'ana@example.com')
+
+    def test_revoked_token_is_rejected(self):
+        self.authenticate()
+        AuthToken.issue(self.user, self.token, generate_refresh_token(),
+                        timezone.now() + datetime.timedelta(days=7))
+        AuthToken.objects.get(user=self.user).revoke()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_token_without_claims_falls_back_to_database(self):
+        with override_settings(JWT_STATELESS_AUTH=False):
+            token = generate_access_token(self.user)
+        with self.assertNumQueries(1):
+            user, _token = self.authenticate(token)
+        self.assertEqual(user.email, 'ana@example.com')
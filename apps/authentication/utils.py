@@ -1,21 +1,33 @@
 # apps/authentication/utils.py
 
+import hashlib
 import jwt
 import uuid
 from django.conf import settings
 from django.utils.timezone import now, timedelta
 
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 
 
+# Atributos del usuario que viajan en el token en modo sin estado
+TOKEN_USER_CLAIMS = ('username', 'first_name', 'last_name',
+                     'is_staff', 'is_active')
+
+
 def generate_access_token(user):
     payload = {
         'user_id': str(user.id),
         'exp': now() + timedelta(minutes=15),
         'iat': now(),
+        # Dos tokens emitidos en el mismo segundo no deben coincidir: al
+        # rotar, el anterior se revoca
+        'jti': uuid.uuid4().hex,
     }
+    if getattr(settings, 'JWT_STATELESS_AUTH', False):
+        payload.update({claim: getattr(user, claim)
+                        for claim in TOKEN_USER_CLAIMS})
     return jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
 
 
@@ -23,42 +35,52 @@ def generate_refresh_token():
     return str(uuid.uuid4())
 
 
+def hash_token(token):
+    return hashlib.sha256(token.encode('utf-8')).digest()
+
+
 # apps/authentication/utils.py
 
 
-def send_verification_email(user, token):
-    subject = "Confirma tu correo electrónico"
-    verification_url = f"{settings.FRONTEND_URL}/verify-email/?token={token}"
+def get_email_context_user(user):
+    # Solo datos serializables: el contexto se guarda en OutboxEmail
+    return {'username': user.username, 'first_name': user.first_name,
+            'last_name': user.last_name, 'email': user.email}
 
-    html_message = render_to_string('emails/verify_email.html', {
-        'user': user,
-        'verification_url': verification_url
-    })
-    plain_message = strip_tags(html_message)
 
-    send_mail(
-        subject=subject,
-        message=plain_message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[user.email],
-        html_message=html_message
-    )
+def send_verification_email(user, token):
+    """Enqueues the verification email; ``send_queued_emails`` sends it."""
+    from apps.authentication.models import OutboxEmail
 
+    verification_url = f"{settings.FRONTEND_URL}/verify-email/?token={token}"
+    OutboxEmail.enqueue(
+        to_email=user.email,
+        subject="Confirma tu correo electrónico",
+        template_name='emails/verify_email.html',
+        context={'user': get_email_context_user(user),
+                 'verification_url': verification_url})
 
-def send_password_reset_email(user, token):
-    subject = "Restablece tu contraseña"
-    reset_url = f"{settings.FRONTEND_URL}/reset-password/?token={token}"
 
-    html_message = render_to_string('emails/reset_password.html', {
-        'user': user,
-        'reset_url': reset_url
-    })
-    plain_message = strip_tags(html_message)
+def send_password_reset_email(user, token):
+    """Enqueues the password reset email; ``send_queued_emails`` sends it."""
+    from apps.authentication.models import OutboxEmail
 
-    send_mail(
-        subject=subject,
-        message=plain_message,
+    reset_url = f"{settings.FRONTEND_URL}/reset-password/?token={token}"
+    OutboxEmail.enqueue(
+        to_email=user.email,
+        subject="Restablece tu contraseña",
+        template_name='emails/reset_password.html',
+        context={'user': get_email_context_user(user),
+                 'reset_url': reset_url})
+
+
+def build_email_message(email, connection=None):
+    html_message = render_to_string(email.template_name, email.context)
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=strip_tags(html_message),
         from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[user.email],
-        html_message=html_message
-    )
+        to=[email.to_email],
+        connection=connection)
+    message.attach_alternative(html_message, 'text/html')
+    return message
@@ -7,7 +7,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from .serializers import LoginSerializer, RefreshTokenSerializer, RegisterSerializer, VerifyEmailSerializer, ForgotPasswordSerializer, ResetPasswordSerializer
 from .utils import generate_access_token, generate_refresh_token, send_verification_email, send_password_reset_email
-from .models import AuthToken, BlacklistedToken, EmailVerification, PasswordResetToken
+from .models import AuthToken, EmailVerification, PasswordResetToken
 from django.utils import timezone
 from datetime import timedelta
 
@@ -38,21 +38,19 @@ login_responses = {
 
 @swagger_auto_schema(request_body=login_request_body, responses=login_responses)
 class LoginView(APIView):
+    authentication_classes = []
+
     def post(self, request):
-        serializer = LoginSerializer(data=request.data)
+        serializer = LoginSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             user = serializer.validated_data
 
-            # Revocar cualquier sesión activa
-            active_token = AuthToken.get_active_token(user)
-            if active_token:
-                active_token.revoke()
-
             access_token = generate_access_token(user)
             refresh_token = generate_refresh_token()
             expires_at = timezone.now() + timedelta(days=7)
 
-            AuthToken.objects.create(
+            # Sustituye la sesión activa (si la hay) y revoca sus tokens
+            AuthToken.issue(
                 user=user,
                 access_token=access_token,
                 refresh_token=refresh_token,
@@ -88,31 +86,25 @@ refresh_responses = {
 
 @swagger_auto_schema(request_body=refresh_request_body, responses=refresh_responses)
 class RefreshTokenView(APIView):
+    authentication_classes = []
+
     def post(self, request):
         serializer = RefreshTokenSerializer(data=request.data)
         if serializer.is_valid():
             refresh_token = serializer.validated_data['refresh_token']
 
-            if BlacklistedToken.is_blacklisted(refresh_token):
-                return Response({'error': 'Refresh token revocado'}, status=status.HTTP_401_UNAUTHORIZED)
-
-            token_obj = AuthToken.objects.filter(
-                refresh_token=refresh_token).first()
-            if not token_obj or not token_obj.is_valid():
+            token_obj = AuthToken.get_by_refresh_token(refresh_token)
+            if not token_obj:
                 return Response({'error': 'Refresh token inválido o expirado'}, status=status.HTTP_401_UNAUTHORIZED)
 
             new_access_token = generate_access_token(token_obj.user)
             new_refresh_token = generate_refresh_token()
             new_expires_at = timezone.now() + timedelta(days=7)
 
-            # Revocar el antiguo token y crear uno nuevo
-            token_obj.revoke()
-            AuthToken.objects.create(
-                user=token_obj.user,
-                access_token=new_access_token,
-                refresh_token=new_refresh_token,
-                expires_at=new_expires_at
-            )
+            # Sustituye los tokens y revoca los antiguos; si otra petición
+            # ya rotó este refresh token, este deja de valer
+            if not token_obj.rotate(new_access_token, new_refresh_token, new_expires_at):
+                return Response({'error': 'Refresh token revocado'}, status=status.HTTP_401_UNAUTHORIZED)
 
             return Response({
                 'access_token': new_access_token,
@@ -132,6 +124,8 @@ logout_responses = {
                      responses=logout_responses
                      )
 class LogoutView(APIView):
+    authentication_classes = []
+
     def post(self, request):
         auth_header = request.headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
@@ -143,8 +137,7 @@ class LogoutView(APIView):
                 token, settings.SECRET_KEY, algorithms=['HS256'])
             user = User.objects.get(id=payload['user_id'])
 
-            token_obj = AuthToken.objects.filter(
-                access_token=token, user=user).first()
+            token_obj = AuthToken.get_by_access_token(token, user)
             if token_obj:
                 token_obj.revoke()
 
@@ -176,6 +169,8 @@ register_responses = {
     responses=register_responses
 )
 class RegisterView(APIView):
+    authentication_classes = []
+
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
@@ -205,6 +200,8 @@ verify_email_responses = {
     responses=verify_email_responses
 )
 class VerifyEmailView(APIView):
+    authentication_classes = []
+
     def get(self, request):
         serializer = VerifyEmailSerializer(data=request.query_params)
         if serializer.is_valid():
@@ -243,6 +240,8 @@ forgot_password_responses = {
     responses=forgot_password_responses
 )
 class ForgotPasswordView(APIView):
+    authentication_classes = []
+
     def post(self, request):
         serializer = ForgotPasswordSerializer(data=request.data)
         if serializer.is_valid():
@@ -279,6 +278,8 @@ reset_password_responses = {
     responses=reset_password_responses
 )
 class ResetPasswordView(APIView):
+    authentication_classes = []
+
     def post(self, request):
         serializer = ResetPasswordSerializer(data=request.data)
         if serializer.is_valid():
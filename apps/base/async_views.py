@@ -0,0 +1,66 @@
+from django.http import Http404, HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from apps.authentication.authentication import JWTAuthentication
+
+
+# apps/base/async_views.py
+
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of a DRF read endpoint for ASGI: JWT
+    authentication through ``aauthenticate``, IsAuthenticated, DRF error
+    bodies and JSONRenderer output, so responses match the sync views.
+    Handlers are ``async def get(...)`` and use the async ORM.
+    """
+
+    authentication_classes = [JWTAuthentication]
+    renderer = JSONRenderer()
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            user, auth = await self.authenticate(request)
+            # Request de DRF para query_params y build_absolute_uri; el
+            # usuario ya autenticado se asigna para que no vuelva a hacerlo.
+            self.request = Request(request, authenticators=())
+            self.request.user, self.request.auth = user, auth
+            return await super().dispatch(request, *args, **kwargs)
+        except Http404 as exc:
+            return self.handle_exception(exceptions.NotFound(*exc.args))
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+
+    async def authenticate(self, request):
+        for authentication in self.authentication_classes:
+            result = await authentication().aauthenticate(request)
+            if result is not None:
+                return result
+        raise exceptions.NotAuthenticated()
+
+    def handle_exception(self, exc):
+        if isinstance(exc.detail, (list, dict)):
+            data = exc.detail
+        else:
+            data = {'detail': exc.detail}
+        status_code = exc.status_code
+        # Como DRF: sin cabecera WWW-Authenticate los 401 se devuelven 403
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            status_code = status.HTTP_403_FORBIDDEN
+        return self.render(data, status=status_code)
+
+    async def http_method_not_allowed(self, request, *args, **kwargs):
+        raise exceptions.MethodNotAllowed(request.method)
+
+    def render(self, data, status=status.HTTP_200_OK):
+        return HttpResponse(self.renderer.render(data), status=status,
+                            content_type='application/json')
@@ -0,0 +1,86 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+
+# apps/base/cache.py
+
+def get_list_cache():
+    config = getattr(settings, 'LIST_RESPONSE_CACHE', {})
+    return caches[config.get('ALIAS', 'default')]
+
+
+def version_key(namespace, user_id):
+    return f'{namespace}:version:{user_id}'
+
+
+def get_list_cache_version(namespace, user_id):
+    cache = get_list_cache()
+    key = version_key(namespace, user_id)
+    version = cache.get(key)
+    if version is None:
+        # Si la versión se pierde (expulsión del backend) se inicia con un
+        # valor nuevo para no volver a servir entradas antiguas.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_list_cache_version(namespace, user_ids):
+    cache = get_list_cache()
+    for user_id in set(user_ids):
+        if user_id is None:
+            continue
+        key = version_key(namespace, user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_list_cache_version_on_commit(namespace, user_ids, using=None):
+    """
+    Bumps now and again when the transaction commits: a list read between
+    the write and the commit would cache the old rows under the new version.
+    """
+    user_ids = set(user_ids)
+    bump_list_cache_version(namespace, user_ids)
+    transaction.on_commit(
+        lambda: bump_list_cache_version(namespace, user_ids), using=using)
+
+
+class ListCacheMixin:
+    """
+    Caches list responses per user, keyed by a per-user version counter and
+    the query params. Writes bump the version, so old entries are never
+    read again and simply expire.
+    """
+
+    list_cache_namespace = None
+
+    def get_list_cache_key(self, request):
+        user_id = request.user.pk
+        version = get_list_cache_version(self.list_cache_namespace, user_id)
+        params = sorted(request.query_params.lists())
+        digest = hashlib.md5(repr(params).encode('utf-8')).hexdigest()
+        return f'{self.list_cache_namespace}:list:{user_id}:{version}:{digest}'
+
+    def list(self, request, *args, **kwargs):
+        if not self.list_cache_namespace:
+            return super().list(request, *args, **kwargs)
+
+        cache = get_list_cache()
+        key = self.get_list_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            config = getattr(settings, 'LIST_RESPONSE_CACHE', {})
+            cache.set(key, response.data, config.get('TIMEOUT', 300))
+        return response
@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+# apps/base/metrics.py
+
+# Métricas por ruta (consultas SQL, tiempo de BD, tiempo de serialización,
+# tamaño de la respuesta) en un buffer circular del proceso. Las recoge
+# EndpointMetricsMiddleware y las expone EndpointMetricsView. Cada proceso
+# tiene su propio buffer: con varios workers, cada petición al informe ve
+# solo el del worker que la atiende.
+
+Sample = namedtuple('Sample', [
+    'duration_ms', 'queries', 'db_ms', 'serializer_ms', 'response_bytes', 'status'])
+
+REPORTED_FIELDS = ('duration_ms', 'queries', 'db_ms', 'serializer_ms', 'response_bytes')
+
+
+def get_config():
+    return getattr(settings, 'ENDPOINT_METRICS', {})
+
+
+def metrics_enabled():
+    return get_config().get('ENABLED', False)
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'serializer_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+
+_current = ContextVar('endpoint_metrics', default=None)
+
+
+def begin_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    ``execute_wrapper`` hook installed on every connection. Queries run
+    outside an instrumented request (or in another context) cost one
+    ContextVar lookup.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        metrics.queries += 1
+
+
+def install_query_recorder(sender=None, connection=None, **kwargs):
+    # Receptor de connection_created: una vez por conexión
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def timed_serializer():
+    """
+    Adds the wall time of the block to the request's serializer time,
+    minus the queries it ran (lazy querysets evaluated while serializing
+    count as DB time). Nested blocks are counted once.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    metrics.serializer_depth += 1
+    if metrics.serializer_depth > 1:
+        try:
+            yield
+        finally:
+            metrics.serializer_depth -= 1
+        return
+    started, db_time = time.perf_counter(), metrics.db_time
+    try:
+        yield
+    finally:
+        metrics.serializer_depth -= 1
+        metrics.serializer_time += (time.perf_counter() - started) - (metrics.db_time - db_time)
+
+
+def percentile(ordered, fraction):
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class MetricsRegistry:
+    """Last ``buffer_size`` samples of up to ``max_routes`` routes."""
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, sample):
+        config = get_config()
+        with self._lock:
+            samples = self._routes.get(route)
+            if samples is None:
+                if len(self._routes) >= config.get('MAX_ROUTES', 200):
+                    return
+                samples = self._routes[route] = deque(maxlen=config.get('BUFFER_SIZE', 500))
+            samples.append(sample)
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def report(self):
+        with self._lock:
+            routes = {route: list(samples) for route, samples in self._routes.items()}
+
+        report = []
+        for route, samples in sorted(routes.items()):
+            entry = {'route': route, 'samples': len(samples), 'errors': sum(
+                1 for sample in samples if sample.status >= 500)}
+            for field in REPORTED_FIELDS:
+                values = sorted(getattr(sample, field) for sample in samples
+                                if getattr(sample, field) is not None)
+                if not values:
+                    entry[field] = None
+                    continue
+                entry[field] = {
+                    'p50': round(percentile(values, 0.50), 2),
+                    'p95': round(percentile(values, 0.95), 2),
+                    'p99': round(percentile(values, 0.99), 2),
+                    'max': round(values[-1], 2),
+                }
+            report.append(entry)
+        return report
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,69 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from apps.base.metrics import Sample, begin_request, end_request, metrics_enabled, registry
+
+
+# apps/base/middleware.py
+
+class EndpointMetricsMiddleware:
+    """
+    Records duration, SQL queries, DB time, serializer time and response
+    size of every resolved request under ``"<METHOD> <url name>"``. The
+    queries are counted by the ``record_query`` execute wrapper, which also
+    sees the queries that async views run through ``sync_to_async``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not metrics_enabled():
+            return self.get_response(request)
+
+        metrics, token = begin_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        self.record(request, response, metrics, started)
+        return response
+
+    async def __acall__(self, request):
+        if not metrics_enabled():
+            return await self.get_response(request)
+
+        metrics, token = begin_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        self.record(request, response, metrics, started)
+        return response
+
+    def record(self, request, response, metrics, started):
+        match = request.resolver_match
+        if match is None:
+            return
+        # El cuerpo de una respuesta en streaming se genera después: su
+        # tamaño y sus consultas no se cuentan
+        size = None if response.streaming else len(response.content)
+        registry.record(f'{request.method} {match.view_name}', Sample(
+            duration_ms=(time.perf_counter() - started) * 1000,
+            queries=metrics.queries,
+            db_ms=metrics.db_time * 1000,
+            serializer_ms=metrics.serializer_time * 1000,
+            response_bytes=size,
+            status=response.status_code,
+        ))
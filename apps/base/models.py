@@ -1,8 +1,37 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import AbstractUser
 
 
+class AuditableQuerySet(models.QuerySet):
+    """Soft delete and restore as a single UPDATE over the queryset."""
+
+    def soft_delete(self, deleted_by=None, **fields):
+        now = timezone.now()
+        return self.update(
+            is_active=False,
+            deleted_by=deleted_by,
+            deleted_date=now,
+            updated_date=now,
+            **fields
+        )
+
+    def restore(self, updated_by=None, **fields):
+        now = timezone.now()
+        return self.update(
+            is_active=True,
+            deleted_by=None,
+            deleted_date=None,
+            updated_by=updated_by,
+            updated_date=now,
+            **fields
+        )
+
+
+AuditableManager = models.Manager.from_queryset(AuditableQuerySet)
+
+
 class AuditableMixins(models.Model):
     created_date = models.DateTimeField(
         verbose_name=_('created date'), auto_now_add=True)
@@ -19,5 +48,7 @@ class AuditableMixins(models.Model):
     deleted_by = models.CharField(verbose_name=_(
         'deleted by'), max_length=255, null=True, blank=True)
 
+    objects = AuditableManager()
+
     class Meta:
         abstract = True
@@ -0,0 +1,221 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+# apps/base/pagination.py
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks on (ordering field, id) instead of using
+    OFFSET, so every page costs the same no matter how deep the client goes.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 200
+    ordering = ('-created_date', '-id')
+    invalid_cursor_message = _('Cursor inválido.')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """The sliced queryset for the requested page, plus one row."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        field, descending = self.get_ordering(queryset)
+        self.field = field
+        queryset = queryset.order_by(*self.ordering_for(field, descending))
+
+        cursor = self.decode_cursor(request, queryset.model, field)
+        if cursor is not None:
+            value, pk = cursor
+            if descending:
+                seek = Q(**{f'{field}__lte': value}) & (
+                    Q(**{f'{field}__lt': value}) | Q(pk__lt=pk))
+            else:
+                seek = Q(**{f'{field}__gte': value}) & (
+                    Q(**{f'{field}__gt': value}) | Q(pk__gt=pk))
+            queryset = queryset.filter(seek)
+
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_ordering(self, queryset):
+        # Un order_by explícito (p. ej. de un OrderingFilter) manda sobre el
+        # orden por defecto; solo cuenta su primer campo, id desempata.
+        order_by = [field for field in queryset.query.order_by
+                    if isinstance(field, str)]
+        field = order_by[0] if order_by else self.ordering[0]
+        return field.lstrip('-'), field.startswith('-')
+
+    def ordering_for(self, field, descending):
+        prefix = '-' if descending else ''
+        return (f'{prefix}{field}', f'{prefix}id')
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def decode_cursor(self, request, model, field):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii'))
+            value, pk = json.loads(raw)
+            value = model._meta.get_field(field).to_python(value)
+            pk = int(pk)
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        # Un cursor manipulado no debe llegar a la consulta: None no se puede
+        # comparar y un id fuera de rango falla en la BD (500)
+        if value is None or not 0 <= pk < 2 ** 63:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+    def encode_cursor(self, row):
+        value = self.row_value(row, self.field)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        raw = json.dumps([value, self.row_value(row, 'id')])
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    def row_value(self, row, name):
+        if isinstance(row, dict):
+            return row[name]
+        return getattr(row, name)
+
+    def get_row_columns(self, queryset):
+        """Columns a ``.values()`` row needs so the cursor can be built."""
+        field, _descending = self.get_ordering(queryset)
+        return [field, 'id']
+
+    def get_next_link(self):
+        if not self.has_next or self.last_row is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.last_row))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class RankedPagination(KeysetPagination):
+    """
+    Page-number pagination for results ordered by relevance, where there
+    is no stable column to seek on. ``paginate_ids`` receives a callable
+    ``fetch(limit, offset)`` returning the ids of one page; no COUNT query
+    is run, one extra id tells whether there is a next page.
+    """
+
+    page_query_param = 'page'
+    max_page = 50
+    invalid_page_message = _('Página inválida.')
+
+    def get_page_number(self, request):
+        try:
+            page = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+        if page < 1 or page > self.max_page:
+            raise NotFound(self.invalid_page_message)
+        return page
+
+    def paginate_ids(self, fetch, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.page = self.get_page_number(request)
+
+        ids = fetch(self.page_size + 1, (self.page - 1) * self.page_size)
+        self.has_next = len(ids) > self.page_size
+        return ids[:self.page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page + 1)
+
+
+class ChangesPagination(KeysetPagination):
+    """
+    Keyset pagination for incremental sync, ascending on
+    (updated_date, id). The response always carries the high-water mark to
+    send back as ``since``, also on the last page, so a client can resume
+    from where it stopped.
+    """
+
+    cursor_query_param = 'since'
+    ordering = ('updated_date', 'id')
+    max_page_size = 500
+
+    def get_page_queryset(self, queryset, request):
+        self.since = request.query_params.get(self.cursor_query_param)
+        return super().get_page_queryset(queryset, request)
+
+    def get_paginated_response(self, data):
+        since = self.since
+        if self.last_row is not None:
+            since = self.encode_cursor(self.last_row)
+        return Response(OrderedDict([
+            ('since', since),
+            ('has_more', self.has_next),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['since', 'has_more', 'results'],
+            'properties': {
+                'since': {'type': 'string', 'nullable': True},
+                'has_more': {'type': 'boolean'},
+                'results': schema,
+            },
+        }
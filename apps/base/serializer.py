@@ -1,4 +1,10 @@
+import copy
+
+from django.conf import settings
 from rest_framework import serializers
+from rest_framework.settings import ISO_8601, api_settings
+
+from apps.base.metrics import timed_serializer
 
 
 class AuditableSerializerMixin(serializers.Serializer):
@@ -8,3 +14,200 @@ class AuditableSerializerMixin(serializers.Serializer):
     updated_by = serializers.CharField(read_only=True)
     deleted_date = serializers.DateTimeField(read_only=True)
     deleted_by = serializers.CharField(read_only=True)
+
+    def to_representation(self, instance):
+        with timed_serializer():
+            return super().to_representation(instance)
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that resolves pks from ``preloaded`` when a
+    BulkListSerializer has fetched them up front, instead of one query per
+    item. Unknown pks fall back to the normal lookup and its errors.
+    """
+    preloaded = None
+
+    def to_internal_value(self, data):
+        if self.preloaded is not None and not isinstance(data, bool):
+            try:
+                return self.preloaded[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """Validates and persists a batch with bulk_create/bulk_update."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.preload_related(data)
+        return super().to_internal_value(data)
+
+    def preload_related(self, data):
+        for name, field in self.child.fields.items():
+            if not isinstance(field, PreloadedPrimaryKeyRelatedField) or field.read_only:
+                continue
+            pks = set()
+            for item in data:
+                try:
+                    pks.add(int(item[name]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            field.preloaded = field.get_queryset().in_bulk(pks)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return model.objects.bulk_create(
+            [model(**attrs) for attrs in validated_data])
+
+    def update(self, instances, validated_data):
+        fields = set()
+        for instance, attrs in zip(instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+            fields.update(attrs)
+        self.child.Meta.model.objects.bulk_update(instances, fields)
+        return instances
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for a ModelSerializer: converts ``.values()`` rows
+    (or model instances) with converters precompiled from the serializer's
+    fields, producing the same output as ``serializer.data``. Serializers
+    with fields it cannot reproduce report ``supported = False``.
+    """
+
+    _compiled = {}
+
+    def __init__(self, serializer_class):
+        self.specs = []
+        self.supported = True
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            spec = self.compile_field(serializer_class, name, field)
+            if spec is None:
+                self.supported = False
+                return
+            self.specs.append(spec)
+
+    @classmethod
+    def for_serializer(cls, serializer_class):
+        compiled = cls._compiled.get(serializer_class)
+        if compiled is None:
+            compiled = cls._compiled[serializer_class] = cls(serializer_class)
+        return compiled
+
+    def subset(self, names):
+        """
+        Returns a copy that only emits ``names`` (and only reads their
+        columns), keeping the serializer's field order.
+        """
+        names = set(names)
+        projected = copy.copy(self)
+        projected.specs = [spec for spec in self.specs if spec[0] in names]
+        return projected
+
+    @property
+    def columns(self):
+        return [column for _name, column, _kind, _field in self.specs]
+
+    def compile_field(self, serializer_class, name, field):
+        if field.source == '*' or '.' in field.source:
+            return None
+        try:
+            model_field = serializer_class.Meta.model._meta.get_field(field.source)
+        except Exception:
+            return None
+        column = model_field.attname
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None or not model_field.many_to_one:
+                return None
+            return (name, column, 'identity', field)
+        if isinstance(field, serializers.DateTimeField):
+            return (name, column, 'datetime', field)
+        if isinstance(field, serializers.ChoiceField):
+            return (name, column, 'choice', field)
+        if isinstance(field, serializers.BooleanField):
+            return (name, column, 'bool', field)
+        if isinstance(field, serializers.CharField):
+            return (name, column, 'str', field)
+        if isinstance(field, serializers.IntegerField):
+            return (name, column, 'int', field)
+        if type(field) is serializers.ReadOnlyField:
+            return (name, column, 'identity', field)
+        return None
+
+    def get_converters(self):
+        # La zona horaria activa puede cambiar por petición, así que los
+        # conversores de fechas se resuelven en cada llamada, no por fila.
+        converters = []
+        for name, column, kind, field in self.specs:
+            if kind == 'datetime':
+                converter = self.datetime_converter(field)
+            elif kind == 'choice':
+                converter = self.choice_converter(field)
+            elif kind == 'bool':
+                converter = bool
+            elif kind == 'str':
+                converter = str
+            elif kind == 'int':
+                converter = int
+            else:
+                converter = None
+            converters.append((name, column, converter))
+        return converters
+
+    def datetime_converter(self, field):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if not settings.USE_TZ or output_format is None or \
+                output_format.lower() != ISO_8601:
+            return field.to_representation
+        tz = getattr(field, 'timezone', field.default_timezone())
+
+        def convert(value):
+            if isinstance(value, str):
+                return value
+            value = value.astimezone(tz).isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return convert
+
+    def choice_converter(self, field):
+        lookup = field.choice_strings_to_values
+
+        def convert(value):
+            if value == '':
+                return value
+            return lookup.get(str(value), value)
+        return convert
+
+    def iterate(self, rows):
+        # Los conversores se resuelven aquí y no al consumir el generador,
+        # que en una respuesta en streaming ocurre fuera de la vista.
+        converters = self.get_converters()
+
+        def items():
+            for row in rows:
+                item = {}
+                for name, column, converter in converters:
+                    value = row[column]
+                    if value is None or converter is None:
+                        item[name] = value
+                    else:
+                        item[name] = converter(value)
+                yield item
+        return items()
+
+    def serialize(self, rows):
+        with timed_serializer():
+            return list(self.iterate(rows))
+
+    def serialize_instance(self, instance):
+        row = {column: getattr(instance, column) for column in self.columns}
+        return self.serialize([row])[0]
@@ -0,0 +1,64 @@
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+
+# apps/base/streaming.py
+
+# Tamaño aproximado (en caracteres) de cada fragmento enviado al cliente
+STREAM_BUFFER_SIZE = 64 * 1024
+
+_encoder = encoders.JSONEncoder(
+    ensure_ascii=not api_settings.UNICODE_JSON,
+    separators=(',', ':') if api_settings.COMPACT_JSON else (', ', ': '),
+    allow_nan=not api_settings.STRICT_JSON,
+)
+
+
+def encode(item):
+    # Mismos escapes que JSONRenderer para que la salida sea JS válido
+    return _encoder.encode(item).replace(
+        '\u2028', '\\u2028').replace('\u2029', '\\u2029')
+
+
+def buffered(pieces, buffer_size=STREAM_BUFFER_SIZE):
+    """
+    Joins small string pieces into chunks of about ``buffer_size`` so the
+    server does not flush once per row.
+    """
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= buffer_size:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def json_array_stream(items):
+    def pieces():
+        yield '['
+        separator = ''
+        for item in items:
+            yield separator
+            yield encode(item)
+            separator = ','
+        yield ']'
+    return buffered(pieces())
+
+
+def ndjson_stream(items):
+    def pieces():
+        for item in items:
+            yield encode(item)
+            yield '\n'
+    return buffered(pieces())
+
+
+STREAM_FORMATS = {
+    'json': ('application/json', 'json', json_array_stream),
+    'ndjson': ('application/x-ndjson', 'ndjson', ndjson_stream),
+}
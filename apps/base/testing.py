@@ -0,0 +1,127 @@
+from collections import namedtuple
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import urlencode
+from rest_framework.test import APIClient
+
+from apps.base.cache import get_list_cache
+
+
+# apps/base/testing.py
+
+# Red de seguridad contra N+1: recorre las rutas de los DefaultRouter,
+# ejecuta cada endpoint con N y con 10N filas y falla si el número de
+# consultas crece con N.
+
+Endpoint = namedtuple('Endpoint', ['name', 'method', 'action', 'detail'])
+
+# Parámetros de una petición: kwargs de la URL, query string y cuerpo
+ScaledRequest = namedtuple('ScaledRequest', ['kwargs', 'params', 'data'],
+                           defaults=(None, None, None))
+
+
+def router_endpoints(router):
+    """Every (url name, HTTP method) the router exposes, API root excluded."""
+    endpoints = []
+    for prefix, viewset, basename in router.registry:
+        for route in router.get_routes(viewset):
+            for method, action in route.mapping.items():
+                if not hasattr(viewset, action):
+                    continue
+                endpoints.append(Endpoint(
+                    name=route.name.format(basename=basename), method=method,
+                    action=action, detail=route.detail))
+    return endpoints
+
+
+class QueryScalingMixin:
+    """
+    TestCase mixin. Subclasses set ``routers``, implement ``seed(count)``
+    (adds ``count`` rows of everything the endpoints read) and extend
+    ``get_request`` for the endpoints that need a body. Every endpoint must
+    be either measured or listed in ``skipped_endpoints`` with a reason, so
+    a new route cannot slip through unchecked.
+
+    Each request runs inside a rolled back savepoint, with the response
+    caches cleared, so writes do not change what the next one sees.
+    """
+
+    routers = ()
+    scale_base = 3
+    scale_factor = 10
+    # {(url name, method): motivo}
+    skipped_endpoints = {}
+
+    def seed(self, count):
+        raise NotImplementedError
+
+    def get_user(self):
+        raise NotImplementedError
+
+    def get_request(self, endpoint, count):
+        """
+        Request for ``endpoint`` when the tables hold ``count`` rows, or
+        None if the test does not know how to call it. By default only
+        GET endpoints are covered; detail routes use ``get_detail_kwargs``.
+        """
+        if endpoint.method != 'get':
+            return None
+        kwargs = self.get_detail_kwargs(endpoint) if endpoint.detail else None
+        return ScaledRequest(kwargs=kwargs)
+
+    def get_detail_kwargs(self, endpoint):
+        raise NotImplementedError
+
+    def get_endpoints(self):
+        return [endpoint for router in self.routers
+                for endpoint in router_endpoints(router)]
+
+    def count_queries(self, endpoint, request):
+        client = APIClient()
+        client.force_authenticate(self.get_user())
+        path = reverse(endpoint.name, kwargs=request.kwargs)
+        if request.params:
+            path = f'{path}?{urlencode(request.params)}'
+        get_list_cache().clear()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(client, endpoint.method)(
+                    path, data=request.data, format='json')
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            transaction.set_rollback(True)
+        self.assertLess(response.status_code, 400,
+                        f'{endpoint.method.upper()} {endpoint.name}: {response.status_code}')
+        return len(queries)
+
+    def measure(self, endpoints, count):
+        return {endpoint: self.count_queries(endpoint, self.get_request(endpoint, count))
+                for endpoint in endpoints}
+
+    def assertQueriesDoNotScale(self):
+        self.seed(self.scale_base)
+        endpoints, unchecked = [], []
+        for endpoint in self.get_endpoints():
+            if (endpoint.name, endpoint.method) in self.skipped_endpoints:
+                continue
+            if self.get_request(endpoint, self.scale_base) is None:
+                unchecked.append(endpoint)
+            else:
+                endpoints.append(endpoint)
+        self.assertFalse(unchecked, 'Endpoints sin cubrir (añádelos a get_request o '
+                                    'a skipped_endpoints): %s' % unchecked)
+
+        large = self.scale_base * self.scale_factor
+        small_counts = self.measure(endpoints, self.scale_base)
+        self.seed(large - self.scale_base)
+        large_counts = self.measure(endpoints, large)
+
+        growing = [f'{endpoint.method.upper()} {endpoint.name}: '
+                   f'{small_counts[endpoint]} -> {large_counts[endpoint]} queries'
+                   for endpoint in endpoints
+                   if large_counts[endpoint] > small_counts[endpoint]]
+        self.assertFalse(growing, 'Query count grows with the number of rows '
+                                  f'({self.scale_base} -> {large}):\n' + '\n'.join(growing))
+        return small_counts
@@ -1,3 +1,472 @@
-from django.test import TestCase
+import base64
+import datetime
+import json
+import time
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from apps.authentication.bloom import revoked_tokens
+from apps.authentication.cache import token_cache, user_cache
+from apps.authentication.models import AuthToken, BlacklistedToken
+from apps.authentication.utils import generate_access_token, generate_refresh_token
+from apps.base.cache import get_list_cache
+from apps.base.metrics import registry
+from apps.base.pagination import KeysetPagination
+from apps.base.streaming import buffered
+from apps.base.testing import Endpoint, QueryScalingMixin, ScaledRequest
+from apps.base.views import ValuesSerializerMixin
+from apps.tasks.models import Task
+from apps.tasks.urls import router as task_router
+from apps.users.models import User
+from apps.users.urls import router as user_router
+
+
+class EndpointMetricsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='ana', email='ana@example.com', password='secret-pass')
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret-pass')
+        Task.objects.bulk_create(
+            [Task(owner=cls.user, title=f'Task {i}', status='pending') for i in range(5)])
+
+    def setUp(self):
+        registry.clear()
+        self.client = APIClient()
+
+    def test_records_queries_per_route(self):
+        self.client.force_authenticate(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('tasks-stats'))
+        self.assertEqual(response.status_code, 200)
+
+        [entry] = registry.report()
+        self.assertEqual(entry['route'], 'GET tasks-stats')
+        self.assertEqual(entry['samples'], 1)
+        self.assertEqual(entry['queries']['p50'], len(queries))
+        self.assertEqual(entry['response_bytes']['max'], len(response.content))
+        self.assertGreaterEqual(entry['duration_ms']['p99'], entry['db_ms']['p99'])
+
+    def test_serializer_time_is_recorded(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse('tasks-list'), {'page_size': 5})
+        self.assertEqual(response.status_code, 200)
+        entry = next(entry for entry in registry.report() if entry['route'] == 'GET tasks-list')
+        self.assertGreater(entry['serializer_ms']['max'], 0)
+
+    def test_report_is_admin_only(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse('endpoint-metrics')).status_code, 403)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('endpoint-metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('GET endpoint-metrics', [entry['route'] for entry in response.data['routes']])
+
+        self.assertEqual(self.client.delete(reverse('endpoint-metrics')).status_code, 204)
+        # Solo queda la propia petición DELETE
+        self.assertEqual([entry['route'] for entry in registry.report()],
+                         ['DELETE endpoint-metrics'])
+
+
+@override_settings(TASK_CHANGES_SETTLE_SECONDS=0)
+class QueryScalingTests(QueryScalingMixin, TestCase):
+    """Ningún endpoint de los routers debe hacer más consultas con más filas."""
+
+    routers = (task_router, user_router)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret-pass')
+        cls.seeded = 0
+
+    def get_user(self):
+        return self.admin
+
+    def seed(self, count):
+        start, self.seeded = self.seeded, self.seeded + count
+        statuses = [choice for choice, _label in Task.STATUS_CHOICES]
+        users = User.objects.bulk_create([
+            User(username=f'user{i}', email=f'user{i}@example.com', password='!',
+                 first_name='Ana', last_name='Pérez')
+            for i in range(start, self.seeded)])
+        Task.objects.bulk_create([
+            Task(owner=self.admin, title=f'Task {i}', description=f'Descripción {i}',
+                 status=statuses[i % len(statuses)], is_active=i % 3 != 1)
+            for i in range(start, self.seeded)
+        ] + [Task(owner=user, title='Other', status='pending') for user in users])
+
+    def own_tasks(self, count, is_active=True):
+        return list(Task.objects.filter(owner=self.admin, is_active=is_active).order_by(
+            'id').values_list('pk', flat=True)[:count])
+
+    def get_detail_kwargs(self, endpoint):
+        if endpoint.name.startswith('users-'):
+            return {'pk': User.objects.filter(is_active=True).exclude(
+                pk=self.admin.pk).order_by('id').values_list('pk', flat=True)[0]}
+        return {'pk': self.own_tasks(1)[0]}
+
+    def get_request(self, endpoint, count):
+        key = (endpoint.name, endpoint.method)
+        task = {'title': 'Nueva', 'description': 'Texto', 'status': 'pending'}
+
+        if key == ('tasks-search', 'get'):
+            return ScaledRequest(params={'q': 'task'})
+        if key == ('tasks-list', 'post'):
+            return ScaledRequest(data=dict(task, owner=self.admin.pk))
+        if key == ('tasks-bulk-create', 'post'):
+            return ScaledRequest(data=[dict(task, owner=self.admin.pk)] * count)
+        if key == ('tasks-bulk-create', 'patch'):
+            return ScaledRequest(data=[{'id': pk, 'title': 'Editada'}
+                                       for pk in self.own_tasks(count)])
+        if key == ('tasks-bulk-archive', 'post'):
+            return ScaledRequest(data={'ids': self.own_tasks(count)})
+        if key == ('tasks-archive', 'post'):
+            return ScaledRequest(params={'status': 'pending'})
+        if key == ('tasks-restore', 'post'):
+            return ScaledRequest(kwargs={'pk': self.own_tasks(1, is_active=False)[0]})
+        if key == ('users-list', 'post'):
+            return ScaledRequest(data={
+                'username': 'nuevo', 'email': 'nuevo@example.com', 'password': 'Secret-pass-123',
+                'first_name': 'Nuevo', 'last_name': 'Usuario'})
+        if endpoint.method in ('put', 'patch', 'delete'):
+            data = None
+            if endpoint.method != 'delete':
+                data = task if endpoint.name.startswith('tasks-') else \
+                    {'first_name': 'Otro', 'last_name': 'Nombre'}
+            return ScaledRequest(kwargs=self.get_detail_kwargs(endpoint), data=data)
+        return super().get_request(endpoint, count)
+
+    @override_settings(PASSWORD_HASHING={'PBKDF2_ITERATIONS': 1000})
+    def test_queries_do_not_scale_with_rows(self):
+        counts = self.assertQueriesDoNotScale()
+        self.assertIn(Endpoint('tasks-list', 'get', 'list', False), counts)
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='ana', email='ana@example.com')
+        tasks = Task.objects.bulk_create(
+            [Task(owner=cls.user, title=f'Task {i}', status='pending') for i in range(7)])
+        # Todas con la misma fecha: el orden lo decide el id
+        same = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        Task.objects.filter(pk__in=[task.pk for task in tasks]).update(
+            created_date=same, updated_date=same)
+
+    def setUp(self):
+        get_list_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, params):
+        ids, url = [], reverse('tasks-list')
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            ids += [item['id'] for item in response.data['results']]
+            url, params = response.data['next'], None
+        return ids
+
+    def encode(self, payload):
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def test_ties_on_created_date(self):
+        expected = list(Task.objects.order_by('-id').values_list('pk', flat=True))
+        self.assertEqual(self.walk({'page_size': 2}), expected)
+
+    def test_ordering_override(self):
+        expected = list(Task.objects.order_by('updated_date', 'id').values_list('pk', flat=True))
+        self.assertEqual(self.walk({'page_size': 3, 'ordering': 'updated_date'}), expected)
+
+    def test_page_size_caps(self):
+        url = reverse('tasks-list')
+        for value, expected in (('3', 3), ('0', 7), ('-1', 7), ('abc', 7)):
+            response = self.client.get(url, {'page_size': value})
+            self.assertEqual(len(response.data['results']), expected, value)
+
+        with mock.patch.object(KeysetPagination, 'max_page_size', 4):
+            response = self.client.get(url, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 4)
+
+    def test_invalid_cursor(self):
+        url = reverse('tasks-list')
+        for cursor in ('garbage', 'ñ', self.encode({'a': 1, 'b': 2}),
+                       self.encode(['no-date', 1]), self.encode([None, 1]),
+                       self.encode(['2024-01-01T00:00:00Z', 2 ** 70]),
+                       self.encode(['2024-01-01T00:00:00Z', 'x'])):
+            response = self.client.get(url, {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='ana', email='ana@example.com')
+        cls.first = Task.objects.create(owner=cls.user, title='Primera', status='pending')
+        cls.second = Task.objects.create(owner=cls.user, title='Segunda', status='pending')
+
+    def setUp(self):
+        get_list_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_malformed_id_is_not_found(self):
+        self.assertEqual(self.client.get('/task/tasks/abc/').status_code, 404)
+        self.assertEqual(self.client.get('/user/users/abc/').status_code, 404)
+
+    def test_retrieve_not_modified(self):
+        url = reverse('tasks-detail', kwargs={'pk': self.first.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+        Task.objects.filter(pk=self.first.pk).update(
+            title='Editada', updated_date=timezone.now() + datetime.timedelta(seconds=2))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Editada')
+
+    def test_list_not_modified(self):
+        url = reverse('tasks-list') + '?status=pending'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_list_changes_when_a_row_leaves_the_filter(self):
+        url = reverse('tasks-list') + '?status=pending'
+        etag = self.client.get(url)['ETag']
+        # La fila más reciente sale del filtro: max(updated_date) retrocede
+        self.client.patch(reverse('tasks-detail', kwargs={'pk': self.second.pk}),
+                          {'status': 'done'}, format='json')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task['id'] for task in response.data['results']], [self.first.pk])
+        # If-Modified-Since no aplica a listados
+        self.assertEqual(self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)).status_code, 200)
+
+    def test_list_changes_when_a_row_is_added(self):
+        url = reverse('tasks-list')
+        etag = self.client.get(url)['ETag']
+        self.client.post(url, {'title': 'Tercera', 'description': 'Texto',
+                               'status': 'pending', 'owner': self.user.pk}, format='json')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 3)
+
+
+class StreamingExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='ana', email='ana@example.com')
+        Task.objects.bulk_create(
+            [Task(owner=cls.user, title=f'Task {i}', description='línea\u2028nueva',
+                  status='pending') for i in range(5)])
+
+    def setUp(self):
+        get_list_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, **params):
+        response = self.client.get(reverse('tasks-export'), params)
+        content = b''.join(response.streaming_content) if response.streaming else None
+        return response, content
+
+    def expected(self):
+        response = self.client.get(reverse('tasks-list'), {'page_size': 100})
+        return sorted(response.data['results'], key=lambda task: task['id'])
+
+    def test_json(self):
+        response, content = self.export()
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="tasks.json"')
+        self.assertNotIn('\u2028'.encode('utf-8'), content)
+        self.assertEqual(sorted(json.loads(content), key=lambda task: task['id']),
+                         json.loads(json.dumps(self.expected())))
+
+    def test_ndjson(self):
+        response, content = self.export(type='ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.decode('utf-8').splitlines()]
+        self.assertEqual(sorted(rows, key=lambda task: task['id']),
+                         json.loads(json.dumps(self.expected())))
+
+    def test_invalid_type(self):
+        response, _content = self.export(type='xml')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('type', response.json())
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_rows_are_read_with_iterator(self):
+        iterator = QuerySet.iterator
+        with mock.patch.object(QuerySet, 'iterator', autospec=True,
+                               side_effect=iterator) as patched, \
+                mock.patch.object(QuerySet, '_fetch_all', autospec=True,
+                                  side_effect=AssertionError('queryset materialized')):
+            _response, content = self.export(type='ndjson')
+        self.assertEqual(len(content.splitlines()), 5)
+        patched.assert_called_once()
+        self.assertEqual(patched.call_args.kwargs, {'chunk_size': 2})
+
+    def test_buffered_chunks(self):
+        chunks = list(buffered((f'{i:04d}' for i in range(100)), buffer_size=40))
+        self.assertEqual(b''.join(chunks), ''.join(f'{i:04d}' for i in range(100)).encode())
+        self.assertEqual(len(chunks), 10)
+
+
+class SparseFieldsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='ana', email='ana@example.com')
+        cls.task = Task.objects.create(owner=cls.user, title='Primera', status='pending',
+                                       description='Texto largo')
+
+    def setUp(self):
+        get_list_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        task_queries = [query['sql'] for query in queries.captured_queries
+                        if 'FROM "tasks_task"' in query['sql']]
+        return response, task_queries
+
+    def assertColumnNotRead(self, queries, column):
+        self.assertTrue(queries)
+        for sql in queries:
+            self.assertNotIn(f'"tasks_task"."{column}"', sql)
+
+    def test_fields(self):
+        response, queries = self.get(reverse('tasks-list'), fields='id,title')
+        self.assertEqual(list(response.data['results'][0]), ['id', 'title'])
+        self.assertColumnNotRead(queries, 'description')
+
+    def test_exclude(self):
+        response, queries = self.get(reverse('tasks-list'), exclude='description,created_by')
+        result = response.data['results'][0]
+        self.assertNotIn('description', result)
+        self.assertNotIn('created_by', result)
+        self.assertIn('title', result)
+        self.assertColumnNotRead(queries, 'description')
+
+    def test_retrieve(self):
+        response, queries = self.get(
+            reverse('tasks-detail', kwargs={'pk': self.task.pk}), fields='title,status')
+        self.assertEqual(response.data, {'title': 'Primera', 'status': 'pending'})
+        self.assertColumnNotRead(queries, 'description')
+
+    def test_unknown_fields(self):
+        for param in ('fields', 'exclude'):
+            response, _queries = self.get(reverse('tasks-list'), **{param: 'title,secret'})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('secret', str(response.data[param]))
+
+    def test_serializer_path_defers_columns(self):
+        # Sin ValuesSerializer la proyección se hace con .only()
+        with mock.patch.object(ValuesSerializerMixin, 'get_values_serializer',
+                               return_value=None):
+            response, queries = self.get(reverse('tasks-list'), fields='id,title')
+        self.assertEqual(list(response.data['results'][0]), ['id', 'title'])
+        self.assertColumnNotRead(queries, 'description')
+
+
+class AsyncViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='ana', email='ana@example.com')
+        cls.other = User.objects.create_user(username='luis', email='luis@example.com')
+        cls.task = Task.objects.create(owner=cls.user, title='Activa', status='pending')
+        cls.archived = Task.objects.create(owner=cls.user, title='Archivada', status='archived',
+                                           is_active=False)
+        cls.foreign = Task.objects.create(owner=cls.other, title='Ajena', status='pending')
+
+    def setUp(self):
+        get_list_cache().clear()
+        token_cache.clear()
+        user_cache.clear()
+        revoked_tokens.reset()
+        self.token = generate_access_token(self.user)
+
+    async def request(self, name, method='get', data=None, token=None, **kwargs):
+        headers = {'Authorization': f'Bearer {token or self.token}'}
+        return await getattr(AsyncClient(), method)(
+            reverse(name, kwargs=kwargs or None), data, headers=headers)
+
+    async def test_requires_authentication(self):
+        responses = [await AsyncClient().get(reverse('tasks-async-list')),
+                     await self.request('tasks-async-list', token='no-es-un-jwt')]
+        for response in responses:
+            self.assertEqual(response.status_code, 403)
+            self.assertIn('detail', response.json())
+
+    async def test_list_matches_sync_view(self):
+        response = await self.request('tasks-async-list')
+        self.assertEqual(response.status_code, 200)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        expected = await sync_to_async(client.get)(reverse('tasks-list'))
+        self.assertEqual(response.json(), json.loads(expected.content))
+
+    async def test_revoked_token_is_checked_with_ais_blacklisted(self):
+        with mock.patch.object(BlacklistedToken, 'ais_blacklisted',
+                               side_effect=BlacklistedToken.ais_blacklisted) as patched:
+            response = await self.request('tasks-async-detail', pk=self.task.pk)
+        self.assertEqual(response.status_code, 200)
+        patched.assert_awaited_once_with(self.token)
+
+        await sync_to_async(self.revoke)()
+        response = await self.request('tasks-async-detail', pk=self.task.pk)
+        self.assertEqual(response.status_code, 403)
+
+    def revoke(self):
+        AuthToken.issue(self.user, self.token, generate_refresh_token(),
+                        timezone.now() + datetime.timedelta(days=7))
+        AuthToken.objects.get(user=self.user).revoke()
+
+    async def test_deactivated_user_is_rejected(self):
+        await self.request('tasks-async-list')
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+        response = await self.request('tasks-async-list')
+        self.assertEqual(response.status_code, 403)
+
+    async def test_permission_errors(self):
+        response = await self.request('tasks-async-detail', pk=self.archived.pk)
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('detail', response.json())
+        response = await self.request('tasks-async-detail', pk=self.foreign.pk)
+        self.assertEqual(response.status_code, 404)
+        response = await self.request('users-async-detail', pk=999999)
+        self.assertEqual(response.status_code, 404)
+        response = await self.request('tasks-async-list', method='post')
+        self.assertEqual(response.status_code, 405)
+
+    async def test_invalid_filter(self):
+        response = await self.request('tasks-async-list', data={'ordering': 'title'})
+        self.assertEqual(response.status_code, 400)
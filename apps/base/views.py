@@ -1,8 +1,24 @@
+import calendar
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from rest_framework.exceptions import PermissionDenied
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework import viewsets
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.views import APIView
+
+from apps.base.metrics import metrics_enabled, registry
+from apps.base.serializer import ValuesSerializer
+from apps.base.streaming import STREAM_FORMATS
 
 
 # apps/base/views.py
@@ -41,18 +57,263 @@ class BaseModelViewSet(viewsets.ModelViewSet):
         else:
             raise PermissionDenied("Usuario no autenticado")
 
+    def get_soft_delete_fields(self):
+        """Extra columns written together with the soft delete."""
+        return {}
+
+    def get_deleted_by(self):
+        user = self.request.user
+        if user.is_authenticated:
+            return get_user_fullname(user)
+        return "Desconocido"
+
     def perform_destroy(self, instance):
+        # Un único UPDATE con los campos de auditoría
+        type(instance).objects.filter(pk=instance.pk).soft_delete(
+            deleted_by=self.get_deleted_by(),
+            **self.get_soft_delete_fields()
+        )
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified support for list and retrieve. Validators come from
+    max(updated_date) and the row count (or the single row's updated_date),
+    so an unchanged resource gets a 304 without running the serializer.
+    Lists only send the ETag: when a row leaves the filter their
+    max(updated_date) can go back in time.
+    """
+
+    def get_list_validators(self):
+        stats = self.filter_queryset(self.get_queryset()).aggregate(
+            last_modified=Max('updated_date'), count=Count('pk'))
+        etag, _last_modified = self.build_validators(
+            stats['last_modified'], 'list', stats['count'])
+        return etag, None
+
+    def get_object_validators(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            row = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).values_list('updated_date', 'is_active').first()
+        except (TypeError, ValueError, DjangoValidationError):
+            # Id mal formado: la vista normal responde 404
+            return None
+        # Sin fila o desactivada: la vista normal decide la respuesta
+        if row is None or not row[1]:
+            return None
+        return self.build_validators(row[0], 'detail', self.kwargs[lookup_url_kwarg])
+
+    def build_validators(self, last_modified, *parts):
         request = self.request
-        user = request.user
+        key = ':'.join(str(part) for part in (
+            request.user.pk, request.get_full_path(), last_modified, *parts))
+        etag = 'W/"%s"' % hashlib.md5(key.encode('utf-8')).hexdigest()
+        if last_modified is not None:
+            last_modified = calendar.timegm(last_modified.utctimetuple())
+        return etag, last_modified
 
-        if user.is_authenticated:
-            full_name = get_user_fullname(user)
-            instance.deleted_by = full_name
-            instance.deleted_date = timezone.now()
-            instance.is_active = False  # o lo que uses para soft delete
-            instance.save()
-        else:
-            instance.deleted_by = "Desconocido"
-            instance.deleted_date = timezone.now()
-            instance.is_active = False
-            instance.save()
+    def conditional_response(self, request, validators, view, *args, **kwargs):
+        if validators is None:
+            return view(request, *args, **kwargs)
+        etag, last_modified = validators
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, self.get_list_validators(), super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, self.get_object_validators(), super().retrieve, *args, **kwargs)
+
+
+class ValuesSerializerMixin:
+
+    def get_values_serializer(self):
+        values = ValuesSerializer.for_serializer(self.get_serializer_class())
+        return values if values.supported else None
+
+
+class FastReadMixin(ValuesSerializerMixin):
+    """
+    Serves list and retrieve through ValuesSerializer: list rows come from
+    ``.values()`` and skip model instances and DRF field machinery. Falls
+    back to the regular serializer when it has fields the fast path cannot
+    reproduce.
+    """
+
+    def list(self, request, *args, **kwargs):
+        values = self.get_values_serializer()
+        if values is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        columns = list(values.columns)
+        if self.paginator is not None and hasattr(self.paginator, 'get_row_columns'):
+            columns += [column for column in self.paginator.get_row_columns(queryset)
+                        if column not in columns]
+        queryset = queryset.values(*columns)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(values.serialize(page))
+        return Response(values.serialize(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        values = self.get_values_serializer()
+        if values is None:
+            return super().retrieve(request, *args, **kwargs)
+        return Response(values.serialize_instance(self.get_object()))
+
+
+class StreamingExportMixin(ValuesSerializerMixin):
+    """
+    Streams a queryset as a JSON array or NDJSON (``?type=json|ndjson``).
+    Rows are read with a server-side ``.iterator()`` and encoded one by
+    one, so memory stays flat and the first bytes go out before the query
+    is exhausted.
+    """
+
+    export_filename = 'export'
+
+    def get_export_chunk_size(self):
+        return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+    def iter_export_items(self, queryset):
+        chunk_size = self.get_export_chunk_size()
+        values = self.get_values_serializer()
+        if values is not None:
+            return values.iterate(
+                queryset.values(*values.columns).iterator(chunk_size=chunk_size))
+
+        return (self.get_serializer(instance).data
+                for instance in queryset.iterator(chunk_size=chunk_size))
+
+    def stream_export(self, request, queryset):
+        export_type = request.query_params.get('type', 'json')
+        if export_type not in STREAM_FORMATS:
+            raise ValidationError(
+                {'type': _('Formato de exportación inválido.')})
+        content_type, extension, stream = STREAM_FORMATS[export_type]
+
+        response = StreamingHttpResponse(
+            stream(self.iter_export_items(queryset)), content_type=content_type)
+        response['Content-Disposition'] = \
+            f'attachment; filename="{self.export_filename}.{extension}"'
+        return response
+
+
+class SparseFieldsMixin:
+    """
+    ``?fields=a,b`` and ``?exclude=c`` trim the serializer output on read
+    actions. The projection is pushed down to SQL: ``.values()`` on the
+    fast path and ``.only()`` otherwise, so unused columns (e.g. long
+    descriptions) are never fetched.
+    """
+
+    sparse_field_actions = ('list', 'retrieve', 'export', 'search')
+    # Campos del modelo que la propia vista lee aunque no se pidan
+    sparse_required_fields = ()
+
+    def parse_field_names(self, param):
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+    def get_sparse_fields(self):
+        if self.action not in self.sparse_field_actions:
+            return None
+        if hasattr(self, '_sparse_fields'):
+            return self._sparse_fields
+
+        requested = self.parse_field_names('fields')
+        excluded = self.parse_field_names('exclude')
+        if requested is None and excluded is None:
+            self._sparse_fields = None
+            return None
+
+        available = [name for name, field in self.get_serializer_class()().fields.items()
+                     if not field.write_only]
+        for param, names in (('fields', requested), ('exclude', excluded)):
+            unknown = [name for name in names or () if name not in available]
+            if unknown:
+                raise ValidationError({param: _('Campos desconocidos: %(fields)s') % {
+                    'fields': ', '.join(unknown)}})
+
+        self._sparse_fields = [
+            name for name in available
+            if (requested is None or name in requested) and name not in (excluded or ())
+        ]
+        return self._sparse_fields
+
+    def get_sparse_columns(self, fields):
+        model = self.get_serializer_class().Meta.model
+        serializer_fields = self.get_serializer_class()().fields
+        columns = list(self.sparse_required_fields)
+        for name in fields:
+            source = serializer_fields[name].source
+            if source == '*' or '.' in source:
+                return None
+            try:
+                model._meta.get_field(source)
+            except Exception:
+                return None
+            columns.append(source)
+        return columns
+
+    def get_values_serializer(self):
+        values = super().get_values_serializer()
+        fields = self.get_sparse_fields()
+        if values is None or fields is None:
+            return values
+        return values.subset(fields)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            target = getattr(serializer, 'child', serializer)
+            for name in list(target.fields):
+                if name not in fields:
+                    target.fields.pop(name)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        columns = self.get_sparse_columns(fields)
+        if columns is None:
+            return queryset
+        return queryset.only(*columns)
+
+
+class EndpointMetricsView(APIView):
+    """
+    Admin-only report of EndpointMetricsMiddleware: p50/p95/p99/max of
+    duration, queries, DB time, serializer time and response size per
+    route. DELETE empties the buffer (e.g. after a deploy).
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({'enabled': metrics_enabled(), 'routes': registry.report()})
+
+    def delete(self, request):
+        registry.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -42,14 +42,14 @@ class TaskAdmin(admin.ModelAdmin):
 
         super().save_model(request, obj, form, change)
 
-    def delete_model(self, request, obj):
+    def get_deleted_by(self, request):
         if request.user.is_authenticated:
-            obj.deleted_by = get_user_fullname(request.user)
-            obj.deleted_date = timezone.now()
-            obj.is_active = False
-            obj.save()
-        else:
-            obj.is_active = False
-            obj.deleted_by = "Anónimo"
-            obj.deleted_date = timezone.now()
-            obj.save()
+            return get_user_fullname(request.user)
+        return "Anónimo"
+
+    def delete_model(self, request, obj):
+        Task.objects.filter(pk=obj.pk).soft_delete(
+            deleted_by=self.get_deleted_by(request))
+
+    def delete_queryset(self, request, queryset):
+        queryset.soft_delete(deleted_by=self.get_deleted_by(request))
@@ -0,0 +1,33 @@
+from django.utils.translation import gettext_lazy as _
+from django_filters import rest_framework as filters
+
+from apps.tasks.models import Task
+
+
+# apps/tasks/filters.py
+
+class TaskFilter(filters.FilterSet):
+    """
+    Filters for TaskViewset. Every filter and ordering lines up with one of
+    the Task indexes (all of them start with ``owner``, which get_queryset
+    always applies); anything else is rejected with a 400.
+    """
+
+    # task_owner_active_status_idx / task_active_owner_status_idx
+    status = filters.ChoiceFilter(choices=Task.STATUS_CHOICES)
+    is_active = filters.BooleanFilter()
+    # task_owner_created_idx / task_owner_updated_idx
+    created_date = filters.IsoDateTimeFromToRangeFilter()
+    updated_date = filters.IsoDateTimeFromToRangeFilter()
+
+    ordering = filters.OrderingFilter(
+        fields=(
+            ('created_date', 'created_date'),
+            ('updated_date', 'updated_date'),
+        ),
+        help_text=_('created_date, updated_date (prefijo "-" para orden descendente)'),
+    )
+
+    class Meta:
+        model = Task
+        fields = ['status', 'is_active', 'created_date', 'updated_date']
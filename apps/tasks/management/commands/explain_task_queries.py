@@ -0,0 +1,111 @@
+# apps/tasks/management/commands/explain_task_queries.py
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.base.pagination import ChangesPagination, KeysetPagination
+from apps.tasks.filters import TaskFilter
+from apps.tasks.views.views import TaskViewset
+from apps.users.models import User
+
+
+INDEX_MARKERS = {
+    'sqlite': ('USING INDEX', 'USING COVERING INDEX', 'USING INTEGER PRIMARY KEY'),
+    'postgresql': ('Index Scan', 'Index Only Scan', 'Bitmap Index Scan'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN on the querysets built by TaskViewset and reports index usage.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int,
+                            help='Owner id used to build the querysets (defaults to the first user).')
+        parser.add_argument('--check', action='store_true',
+                            help='Exit with an error if any query does not use an index.')
+
+    def handle(self, *args, **options):
+        markers = INDEX_MARKERS.get(connection.vendor)
+        if markers is None:
+            raise CommandError(
+                f'Unsupported database vendor: {connection.vendor}')
+
+        user = self.get_user(options['user'])
+        failures = []
+        for name, queryset in self.get_querysets(user):
+            plan = self.explain(queryset)
+            uses_index = any(marker in plan for marker in markers)
+            if not uses_index:
+                failures.append(name)
+            style = self.style.SUCCESS if uses_index else self.style.ERROR
+            self.stdout.write(style(f'== {name}: {"index" if uses_index else "NO INDEX"}'))
+            self.stdout.write(plan)
+
+        if options['check'] and failures:
+            raise CommandError(
+                f'Queries without index: {", ".join(failures)}')
+
+    def get_user(self, user_id):
+        if user_id is not None:
+            try:
+                return User.objects.get(pk=user_id)
+            except User.DoesNotExist:
+                raise CommandError(f'User {user_id} does not exist')
+        # Con la tabla vacía basta un usuario sin guardar con pk
+        return User.objects.order_by('pk').first() or User(pk=0)
+
+    def get_view(self, user, **params):
+        view = TaskViewset()
+        view.request = SimpleNamespace(user=user, query_params=params)
+        view.format_kwarg = None
+        return view
+
+    def get_querysets(self, user):
+        view = self.get_view(user)
+        base = view.get_queryset()
+        paginator = KeysetPagination()
+        page_size = paginator.page_size + 1
+
+        def page(**params):
+            # Mismo queryset que construyen TaskFilter y KeysetPagination
+            queryset = TaskFilter(params, queryset=base).qs
+            order = paginator.ordering_for(*paginator.get_ordering(queryset))
+            return queryset.order_by(*order)[:page_size]
+
+        return [
+            ('list', page()),
+            ('list_by_status', page(status='done')),
+            ('list_active_by_status', page(is_active='true', status='pending')),
+            ('list_active', page(is_active='true')),
+            ('list_created_range', page(
+                created_date_after='2024-01-01T00:00:00Z',
+                created_date_before='2024-12-31T23:59:59Z')),
+            ('list_by_updated', page(ordering='-updated_date')),
+            ('list_updated_since', page(
+                updated_date_after='2024-01-01T00:00:00Z', ordering='updated_date')),
+            ('changes', self.changes(user)),
+            ('retrieve', base.filter(pk=1)),
+        ]
+
+    def changes(self, user):
+        # Mismo queryset que TaskViewset.changes con un cursor ``since``
+        paginator = ChangesPagination()
+        paginator.field = 'updated_date'
+        since = paginator.encode_cursor(
+            {'updated_date': timezone.now() - timedelta(days=1), 'id': 0})
+        view = self.get_view(user, since=since)
+        return paginator.get_page_queryset(view.get_changes_queryset(), view.request)
+
+    def explain(self, queryset):
+        if connection.vendor != 'postgresql':
+            return queryset.explain()
+        # En tablas pequeñas PostgreSQL prefiere un seq scan; se desactiva
+        # para comprobar que existe un índice utilizable.
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
@@ -0,0 +1,25 @@
+# apps/tasks/management/commands/rebuild_task_search.py
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from apps.tasks.search import install_index, search_backend
+
+
+class Command(BaseCommand):
+    help = ('Recreates the task full-text index (FTS5 table and triggers on SQLite, '
+            'GIN index on PostgreSQL) and repopulates it.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        with transaction.atomic(using=options['database']):
+            install_index(connection)
+        backend = search_backend(connection)
+        if backend is None:
+            self.stdout.write(
+                f'{connection.vendor}: no full-text index, search uses icontains.')
+        else:
+            self.stdout.write(f'{backend}: task search index rebuilt.')
@@ -0,0 +1,25 @@
+# apps/tasks/management/commands/reconcile_task_stats.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.tasks.models import TaskStatusCount
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the TaskStatusCount table from the tasks table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--check', action='store_true',
+                            help='Only report drift; exit with an error if the counters are out of date.')
+
+    def handle(self, *args, **options):
+        drift = TaskStatusCount.rebuild(
+            using=options['database'], commit=not options['check'])
+        if options['check']:
+            if drift:
+                raise CommandError(f'{drift} task counters out of date')
+            self.stdout.write(self.style.SUCCESS('Task counters are up to date.'))
+        else:
+            self.stdout.write(f'{drift} task counters corrected.')
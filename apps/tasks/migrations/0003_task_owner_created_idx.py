@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', 'created_date', 'id'], name='task_owner_created_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_owner_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', 'is_active', 'status'], name='task_owner_active_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['owner', 'status'], name='task_active_owner_status_idx'),
+        ),
+    ]
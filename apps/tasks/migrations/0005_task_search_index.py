@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from apps.tasks.search import drop_index, install_index
+
+
+def create_search_index(apps, schema_editor):
+    install_index(schema_editor.connection)
+
+
+def remove_search_index(apps, schema_editor):
+    drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_owner_status_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, remove_search_index),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_tasks(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskStatusCount = apps.get_model('tasks', 'TaskStatusCount')
+    db = schema_editor.connection.alias
+
+    rows = Task.objects.using(db).order_by().values(
+        'owner_id', 'status', 'is_active').annotate(total=Count('pk'))
+    TaskStatusCount.objects.using(db).bulk_create(
+        [TaskStatusCount(owner_id=row['owner_id'], status=row['status'],
+                         is_active=row['is_active'], count=row['total'])
+         for row in rows],
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_owner_updated_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=20, verbose_name='status')),
+                ('is_active', models.BooleanField(verbose_name='active')),
+                ('count', models.IntegerField(default=0, verbose_name='count')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_counts', to=settings.AUTH_USER_MODEL, verbose_name='owner')),
+            ],
+            options={
+                'verbose_name': 'task status count',
+                'verbose_name_plural': 'task status counts',
+                'constraints': [models.UniqueConstraint(fields=('owner', 'status', 'is_active'), name='task_status_count_unique')],
+            },
+        ),
+        migrations.RunPython(count_existing_tasks, migrations.RunPython.noop),
+    ]
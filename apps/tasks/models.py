@@ -1,11 +1,112 @@
-from django.db import models
+from collections import Counter
+
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import Count, F
 from django.utils.translation import gettext_lazy as _
-from apps.base.models import AuditableMixins
+from apps.base.cache import bump_list_cache_version_on_commit
+from apps.base.models import AuditableMixins, AuditableQuerySet
 from apps.users.models import User
 
 
 # Create your models here.
 
+# Campos que definen la fila de TaskStatusCount a la que cuenta una tarea
+COUNTER_FIELDS = ('owner_id', 'status', 'is_active')
+COUNTER_UPDATE_FIELDS = {'owner', 'owner_id', 'status', 'is_active'}
+
+# Namespace de la cache de listas de TaskViewset
+TASK_LIST_CACHE = 'tasks'
+
+
+def invalidate_task_lists(owner_ids, using=None):
+    bump_list_cache_version_on_commit(
+        TASK_LIST_CACHE, [owner_id for owner_id in owner_ids if owner_id is not None],
+        using=using)
+
+
+class TaskQuerySet(AuditableQuerySet):
+    """
+    Keeps TaskStatusCount in step with every set-based write (update,
+    soft_delete, restore, bulk_create, bulk_update, delete), inside the
+    same transaction as the write, and invalidates the cached task lists
+    of the owners involved. The keys are read from the rows as stored,
+    locked with SELECT ... FOR UPDATE, so a concurrent write to the same
+    tasks cannot make the deltas drift.
+    """
+
+    def counter_groups(self):
+        rows = self.order_by().values(*COUNTER_FIELDS).annotate(
+            total=Count('pk')).values_list(*COUNTER_FIELDS, 'total')
+        return Counter({tuple(row[:3]): row[3] for row in rows})
+
+    def locked_counter_groups(self):
+        # PostgreSQL no admite FOR UPDATE con GROUP BY: se agrupa aquí
+        return Counter(tuple(row) for row in self.order_by().select_for_update().values_list(
+            *COUNTER_FIELDS))
+
+    def update(self, **kwargs):
+        tracked = COUNTER_UPDATE_FIELDS.intersection(kwargs)
+        if not tracked:
+            owner_ids = set(self.order_by().values_list('owner_id', flat=True).distinct())
+            rows = super().update(**kwargs)
+            invalidate_task_lists(owner_ids, using=self.db)
+            return rows
+
+        deltas = Counter()
+        with transaction.atomic(using=self.db):
+            if any(hasattr(kwargs[name], 'resolve_expression') for name in tracked):
+                # Valores calculados en la BD (p. ej. bulk_update): se leen
+                # las claves antes y después, fila a fila.
+                before = {pk: tuple(key) for pk, *key in
+                          self.select_for_update().values_list('pk', *COUNTER_FIELDS)}
+                rows = super().update(**kwargs)
+                after = self.model._base_manager.using(self.db).filter(
+                    pk__in=list(before)).values_list('pk', *COUNTER_FIELDS)
+                for pk, *key in after:
+                    deltas[before[pk]] -= 1
+                    deltas[tuple(key)] += 1
+            else:
+                before = self.locked_counter_groups()
+                rows = super().update(**kwargs)
+                for key, total in before.items():
+                    deltas[key] -= total
+                    deltas[self.updated_key(key, kwargs)] += total
+            TaskStatusCount.apply(deltas, using=self.db)
+        invalidate_task_lists({owner_id for owner_id, _status, _active in deltas}, using=self.db)
+        return rows
+
+    update.alters_data = True
+
+    def updated_key(self, key, values):
+        owner_id, status, is_active = key
+        owner = values.get('owner_id', values.get('owner', owner_id))
+        return (getattr(owner, 'pk', owner),
+                values.get('status', status),
+                values.get('is_active', is_active))
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            TaskStatusCount.apply(
+                Counter(obj.counter_key() for obj in objs), using=self.db)
+        invalidate_task_lists({obj.owner_id for obj in objs}, using=self.db)
+        return objs
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            before = self.locked_counter_groups()
+            result = super().delete()
+            TaskStatusCount.apply(
+                Counter({key: -total for key, total in before.items()}), using=self.db)
+        invalidate_task_lists({owner_id for owner_id, _status, _active in before}, using=self.db)
+        return result
+
+    delete.alters_data = True
+
+
+TaskManager = models.Manager.from_queryset(TaskQuerySet)
+
+
 class Task(AuditableMixins, models.Model):
     """Task Model"""
 
@@ -23,9 +124,130 @@ class Task(AuditableMixins, models.Model):
         _('status'), max_length=20, choices=STATUS_CHOICES, default='pendiente')
     is_active = models.BooleanField(_('active'), default=True)
 
+    objects = TaskManager()
+
     class Meta:
         verbose_name = _('task')
         verbose_name_plural = _('tasks')
+        indexes = [
+            # Soporta la paginación por cursor de TaskViewset.list
+            models.Index(fields=['owner', 'created_date', 'id'],
+                         name='task_owner_created_idx'),
+            # Orden y rangos por fecha de modificación (TaskFilter)
+            models.Index(fields=['owner', 'updated_date', 'id'],
+                         name='task_owner_updated_idx'),
+            # Filtros por estado y borrado lógico del propietario
+            models.Index(fields=['owner', 'is_active', 'status'],
+                         name='task_owner_active_status_idx'),
+            models.Index(fields=['owner', 'status'],
+                         condition=models.Q(is_active=True),
+                         name='task_active_owner_status_idx'),
+        ]
 
     def __str__(self):
         return self.title
+
+    def counter_key(self):
+        return (self.owner_id, self.status, self.is_active)
+
+    def stored_counter_key(self, using):
+        # Clave tal como está guardada, con la fila bloqueada hasta el
+        # commit: otra petición puede haberla cambiado desde que se cargó
+        return type(self)._base_manager.using(using).select_for_update().filter(
+            pk=self.pk).values_list(*COUNTER_FIELDS).first()
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        if update_fields is not None and \
+                not COUNTER_UPDATE_FIELDS.intersection(update_fields):
+            super().save(*args, **kwargs)
+            invalidate_task_lists([self.owner_id], using=using)
+            return
+
+        with transaction.atomic(using=using):
+            old_key = None if self._state.adding else self.stored_counter_key(using)
+            super().save(*args, **kwargs)
+            new_key = self.counter_key()
+            if old_key != new_key:
+                deltas = Counter({new_key: 1})
+                if old_key is not None:
+                    deltas[tuple(old_key)] -= 1
+                TaskStatusCount.apply(deltas, using=using)
+        invalidate_task_lists({new_key[0], old_key[0] if old_key else None}, using=using)
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            key = self.stored_counter_key(using)
+            result = super().delete(*args, **kwargs)
+            if key is not None:
+                TaskStatusCount.apply(Counter({tuple(key): -1}), using=using)
+        invalidate_task_lists([self.owner_id], using=using)
+        return result
+
+
+class TaskStatusCount(models.Model):
+    """
+    Denormalized number of tasks per (owner, status, is_active). Written in
+    the same transaction as the task change by Task and TaskQuerySet;
+    ``reconcile_task_stats`` rebuilds it from the tasks table.
+    """
+
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='task_counts', verbose_name=_('owner'))
+    status = models.CharField(_('status'), max_length=20)
+    is_active = models.BooleanField(_('active'))
+    count = models.IntegerField(_('count'), default=0)
+
+    class Meta:
+        verbose_name = _('task status count')
+        verbose_name_plural = _('task status counts')
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'status', 'is_active'],
+                                    name='task_status_count_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.owner_id} {self.status} {self.is_active}: {self.count}'
+
+    @classmethod
+    def apply(cls, deltas, using=None):
+        manager = cls.objects.db_manager(using)
+        for (owner_id, status, is_active), delta in deltas.items():
+            if not delta:
+                continue
+            key = {'owner_id': owner_id, 'status': status, 'is_active': is_active}
+            # Si falta la fila y el delta es negativo, el propietario se
+            # está borrando en cascada: no hay nada que descontar.
+            if manager.filter(**key).update(count=F('count') + delta) or delta < 0:
+                continue
+            try:
+                with transaction.atomic(using=manager.db):
+                    manager.create(count=delta, **key)
+            except IntegrityError:
+                # Otra transacción creó la fila entre el UPDATE y el INSERT
+                manager.filter(**key).update(count=F('count') + delta)
+
+    @classmethod
+    def rebuild(cls, using=None, commit=True):
+        """
+        Replaces the table with counts computed from the tasks table and
+        returns the number of (owner, status, is_active) rows that differed.
+        With ``commit=False`` it only reports the difference.
+        """
+        manager = cls.objects.db_manager(using)
+        with transaction.atomic(using=manager.db):
+            actual = Task.objects.db_manager(manager.db).all().counter_groups()
+            stored = {(owner_id, status, is_active): count
+                      for owner_id, status, is_active, count in manager.select_for_update()
+                      .values_list('owner_id', 'status', 'is_active', 'count')}
+            drift = sum(1 for key in set(actual) | set(stored)
+                        if actual.get(key, 0) != stored.get(key, 0))
+            if drift and commit:
+                manager.all().delete()
+                manager.bulk_create(
+                    [cls(owner_id=owner_id, status=status, is_active=is_active, count=count)
+                     for (owner_id, status, is_active), count in actual.items()],
+                    batch_size=500)
+        return drift
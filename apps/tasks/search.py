@@ -0,0 +1,172 @@
+import re
+
+from django.db import OperationalError, connections, router
+from django.db.models import Q
+
+
+# apps/tasks/search.py
+
+# Búsqueda de texto completo sobre título y descripción de las tareas.
+#
+# SQLite: tabla virtual FTS5 de contenido externo (tasks_task_fts) que se
+# mantiene sincronizada con triggers, así que también la actualizan
+# bulk_create() y update(). Las migraciones que reconstruyen tasks_task en
+# SQLite eliminan los triggers: después hay que ejecutar
+# ``manage.py rebuild_task_search``.
+#
+# PostgreSQL: índice GIN sobre la misma expresión tsvector que se usa en
+# la consulta (si cambia una, hay que cambiar la otra).
+
+FTS_TABLE = 'tasks_task_fts'
+MAX_TERMS = 8
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+PG_CONFIG = 'simple'
+PG_INDEX = 'task_search_vector_idx'
+PG_VECTOR = (
+    f"setweight(to_tsvector('{PG_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{PG_CONFIG}', coalesce(description, '')), 'B')"
+)
+
+SQLITE_INDEX_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, content='tasks_task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2')""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+        AFTER UPDATE OF title, description ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_SQL = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+PG_INDEX_SQL = [
+    f'CREATE INDEX IF NOT EXISTS {PG_INDEX} ON tasks_task USING gin (({PG_VECTOR}))',
+]
+
+PG_DROP_SQL = [
+    f'DROP INDEX IF EXISTS {PG_INDEX}',
+]
+
+# Backend detectado por alias de conexión; install_index/drop_index lo
+# reinician en este proceso, los demás lo ven al reiniciarse.
+_backends = {}
+
+
+def install_index(connection):
+    _backends.pop(connection.alias, None)
+    statements = {'sqlite': SQLITE_INDEX_SQL,
+                  'postgresql': PG_INDEX_SQL}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            try:
+                cursor.execute(sql)
+            except OperationalError:
+                # SQLite compilado sin FTS5: la búsqueda usa icontains
+                if connection.vendor != 'sqlite' or sql != statements[0]:
+                    raise
+                return
+
+
+def drop_index(connection):
+    _backends.pop(connection.alias, None)
+    statements = {'sqlite': SQLITE_DROP_SQL,
+                  'postgresql': PG_DROP_SQL}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def search_terms(query):
+    """
+    Splits the user query into plain word terms. Operators, quotes and any
+    other syntax of the search engines are dropped, so the query can never
+    be malformed.
+    """
+    return re.findall(r'\w+', (query or '').lower())[:MAX_TERMS]
+
+
+def search_backend(connection):
+    if connection.alias not in _backends:
+        _backends[connection.alias] = detect_backend(connection)
+    return _backends[connection.alias]
+
+
+def detect_backend(connection):
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite' and \
+            FTS_TABLE in connection.introspection.table_names():
+        return 'sqlite'
+    return None
+
+
+def fts5_query(terms):
+    # Cada término entre comillas: FTS5 lo trata como texto, nunca como operador
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def tsquery(terms):
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def ranked_ids(queryset, terms, limit, offset=0):
+    """
+    Returns the ids of the tasks in ``queryset`` matching every term
+    (prefix match), best match first.
+    """
+    connection = connections[router.db_for_read(queryset.model)]
+    backend = search_backend(connection)
+    if backend is None:
+        return fallback_ids(queryset, terms, limit, offset)
+
+    subquery, params = queryset.order_by().values('pk').query.sql_with_params()
+    if backend == 'sqlite':
+        match = fts5_query(terms)
+        sql = (
+            f'SELECT rowid FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid IN ({subquery}) '
+            f'ORDER BY bm25({FTS_TABLE}, %s, %s), rowid DESC '
+            f'LIMIT %s OFFSET %s'
+        )
+        params = [match, *params, TITLE_WEIGHT, DESCRIPTION_WEIGHT, limit, offset]
+    else:
+        match = tsquery(terms)
+        sql = (
+            f'SELECT id FROM tasks_task, to_tsquery(%s, %s) query '
+            f'WHERE ({PG_VECTOR}) @@ query AND id IN ({subquery}) '
+            f'ORDER BY ts_rank({PG_VECTOR}, query) DESC, id DESC '
+            f'LIMIT %s OFFSET %s'
+        )
+        params = [PG_CONFIG, match, *params, limit, offset]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def fallback_ids(queryset, terms, limit, offset=0):
+    # Sin índice de texto completo: icontains por término, sin ranking
+    for term in terms:
+        queryset = queryset.filter(
+            Q(title__icontains=term) | Q(description__icontains=term))
+    return list(queryset.order_by('-created_date', '-id').values_list(
+        'pk', flat=True)[offset:offset + limit])
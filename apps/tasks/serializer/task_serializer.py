@@ -1,5 +1,9 @@
 from rest_framework import serializers
-from apps.base.serializer import AuditableSerializerMixin
+from apps.base.serializer import (
+    AuditableSerializerMixin,
+    BulkListSerializer,
+    PreloadedPrimaryKeyRelatedField
+)
 from apps.tasks.models import Task
 
 
@@ -15,9 +19,11 @@ class TaskListSerializer(AuditableSerializerMixin, serializers.ModelSerializer):
 
 
 class TaskCreateSerializer(AuditableSerializerMixin, serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = Task
-        fields = ['title', 'description', 'status', 'is_active', 'owner',
+        fields = ['id', 'title', 'description', 'status', 'is_active', 'owner',
                   'created_date', 'created_by',
                   'updated_date', 'updated_by',
                   'deleted_date', 'deleted_by'
@@ -27,6 +33,7 @@ class TaskCreateSerializer(AuditableSerializerMixin, serializers.ModelSerializer
             'updated_date', 'updated_by',
             'deleted_date', 'deleted_by'
         ]
+        list_serializer_class = BulkListSerializer
 
     def validate_title(self, value):
         if not value.strip():
@@ -50,6 +57,7 @@ class TaskUpdateSerializer(AuditableSerializerMixin, serializers.ModelSerializer
         read_only_fields = [
             'updated_date', 'updated_by'
         ]
+        list_serializer_class = BulkListSerializer
 
     def validate_title(self, value):
         if not value.strip():
@@ -1,3 +1,658 @@
-from django.test import TestCase
+import datetime
+import io
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Value
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.base.cache import get_list_cache, get_list_cache_version
+from apps.base.serializer import ValuesSerializer
+from apps.tasks.filters import TaskFilter
+from apps.tasks.models import TASK_LIST_CACHE, Task, TaskStatusCount
+from apps.tasks.search import (
+    FTS_TABLE, drop_index, fts5_query, install_index, ranked_ids, search_backend,
+    search_terms, tsquery
+)
+from apps.tasks.serializer.task_serializer import TaskCreateSerializer, TaskListSerializer
+from apps.users.models import User
+
+
+class TaskListSerializerParityTests(TestCase):
+    """The ValuesSerializer fast path must render the same JSON bytes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='ana', email='ana@example.com', password='secret-pass',
+            first_name='Ana', last_name='Pérez')
+        Task.objects.create(owner=cls.user, title='Plain', status='pending')
+        Task.objects.create(
+            owner=cls.user, title='Ünïcödé ✓ "quoted"', description='línea\nnueva',
+            status='in_progress', created_by='Ana Pérez', updated_by='Ana Pérez')
+        Task.objects.create(owner=cls.user, title='Empty description',
+                            description='', status='done')
+        deleted = Task.objects.create(owner=cls.user, title='Deleted', status='archived')
+        Task.objects.filter(pk=deleted.pk).soft_delete(deleted_by='Ana Pérez')
+        # Fechas sin microsegundos cambian el formato de isoformat()
+        Task.objects.filter(title='Plain').update(
+            created_date=datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc))
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_values_rows_render_identically(self):
+        queryset = Task.objects.order_by('id')
+        values = ValuesSerializer.for_serializer(TaskListSerializer)
+        self.assertTrue(values.supported)
+        self.assertEqual(
+            self.render(values.serialize(queryset.values(*values.columns))),
+            self.render(TaskListSerializer(queryset, many=True).data))
+
+    def test_instances_render_identically(self):
+        values = ValuesSerializer.for_serializer(TaskListSerializer)
+        for task in Task.objects.all():
+            self.assertEqual(
+                self.render(values.serialize_instance(task)),
+                self.render(TaskListSerializer(task).data))
+
+    def test_non_utc_timezone_renders_identically(self):
+        queryset = Task.objects.order_by('id')
+        values = ValuesSerializer.for_serializer(TaskListSerializer)
+        with timezone.override('America/Havana'):
+            self.assertEqual(
+                self.render(values.serialize(queryset.values(*values.columns))),
+                self.render(TaskListSerializer(queryset, many=True).data))
+
+    def test_list_endpoint_matches_serializer(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/task/tasks/')
+        self.assertEqual(response.status_code, 200)
+        queryset = Task.objects.filter(owner=self.user).order_by('-created_date', '-id')
+        self.assertEqual(
+            self.render(response.data['results']),
+            self.render(TaskListSerializer(queryset, many=True).data))
+
+    def test_retrieve_endpoint_matches_serializer(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        task = Task.objects.get(title='Plain')
+        response = client.get(f'/task/tasks/{task.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.render(response.data),
+                         self.render(TaskListSerializer(task).data))
+
+
+class TaskIndexUsageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='ana', email='ana@example.com')
+        Task.objects.bulk_create(
+            [Task(owner=user, title=f'Task {i}', status='pending') for i in range(20)])
+
+    def test_every_task_query_uses_an_index(self):
+        # --check falla (CommandError) si alguna consulta recorre la tabla
+        stdout = io.StringIO()
+        call_command('explain_task_queries', '--check', stdout=stdout)
+        self.assertNotIn('NO INDEX', stdout.getvalue())
+
+
+class BulkTaskTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='ana', email='ana@example.com')
+        self.other = User.objects.create_user(username='luis', email='luis@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def items(self, count, **extra):
+        return [dict({'title': f'Task {i}', 'description': 'x', 'status': 'pending',
+                      'owner': self.user.pk}, **extra) for i in range(count)]
+
+    def count_queries(self, method, name, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(reverse(name), data, format='json')
+        self.assertLess(response.status_code, 400, response.content)
+        return len(queries)
+
+    def test_errors_are_reported_per_item(self):
+        items = self.items(3)
+        items[1]['title'] = ' '
+        items[2]['owner'] = 999999
+        response = self.client.post(reverse('tasks-bulk-create'), items, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['error']
+        self.assertEqual(errors[0], {})
+        self.assertEqual(list(errors[1]), ['title'])
+        self.assertEqual(list(errors[2]), ['owner'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_related_pks_are_preloaded_in_one_query(self):
+        items = self.items(5) + self.items(5, owner=self.other.pk)
+        serializer = TaskCreateSerializer(data=items, many=True)
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual([attrs['owner'] for attrs in serializer.validated_data],
+                         [self.user] * 5 + [self.other] * 5)
+
+    def test_unknown_related_pk_falls_back_to_lookup(self):
+        items = self.items(3)
+        items[1]['owner'] = 999999
+        serializer = TaskCreateSerializer(data=items, many=True)
+        # Carga en bloque + la búsqueda normal del pk desconocido
+        with self.assertNumQueries(2):
+            self.assertFalse(serializer.is_valid())
+        self.assertEqual([list(errors) for errors in serializer.errors], [[], ['owner'], []])
+
+    def test_bulk_create_queries_do_not_scale(self):
+        self.count_queries('post', 'tasks-bulk-create', self.items(1))
+        small = self.count_queries('post', 'tasks-bulk-create', self.items(2))
+        large = self.count_queries('post', 'tasks-bulk-create', self.items(20))
+        self.assertEqual(small, large)
+        self.assertEqual(Task.objects.count(), 23)
+
+    def test_bulk_update_queries_do_not_scale(self):
+        self.client.post(reverse('tasks-bulk-create'), self.items(23), format='json')
+        ids = list(Task.objects.order_by('pk').values_list('pk', flat=True))
+        self.count_queries('patch', 'tasks-bulk-create', [{'id': ids[0], 'status': 'done'}])
+        small = self.count_queries('patch', 'tasks-bulk-create',
+                                   [{'id': pk, 'status': 'done'} for pk in ids[1:3]])
+        large = self.count_queries('patch', 'tasks-bulk-create',
+                                   [{'id': pk, 'status': 'done'} for pk in ids[3:]])
+        self.assertEqual(small, large)
+        self.assertFalse(Task.objects.exclude(status='done').exists())
+
+    def test_bulk_update_reports_missing_and_inactive_tasks(self):
+        self.client.post(reverse('tasks-bulk-create'), self.items(2), format='json')
+        active, archived = Task.objects.order_by('pk')
+        Task.objects.filter(pk=archived.pk).soft_delete(deleted_by='Ana')
+        response = self.client.patch(reverse('tasks-bulk-create'), [
+            {'id': active.pk, 'status': 'done'}, {'id': archived.pk, 'status': 'done'},
+            {'id': 999999, 'status': 'done'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([list(errors) for errors in response.json()['error']],
+                         [[], ['id'], ['id']])
+        self.assertEqual(Task.objects.get(pk=active.pk).status, 'pending')
+
+    def test_bulk_archive_queries_do_not_scale(self):
+        self.client.post(reverse('tasks-bulk-create'), self.items(23), format='json')
+        ids = list(Task.objects.order_by('pk').values_list('pk', flat=True))
+        self.count_queries('post', 'tasks-bulk-archive', {'ids': ids[:1]})
+        small = self.count_queries('post', 'tasks-bulk-archive', {'ids': ids[1:3]})
+        large = self.count_queries('post', 'tasks-bulk-archive', {'ids': ids[3:]})
+        self.assertEqual(small, large)
+        self.assertFalse(Task.objects.filter(is_active=True).exists())
+
+
+class TaskListCacheInvalidationTests(TestCase):
+    """Every write path must invalidate the cached lists of the owners."""
+
+    def setUp(self):
+        get_list_cache().clear()
+        self.user = User.objects.create_user(username='ana', email='ana@example.com')
+        self.other = User.objects.create_user(username='luis', email='luis@example.com')
+        self.task = Task.objects.create(owner=self.user, title='Primera', status='pending')
+        self.client = APIClient()
+
+    def titles(self, user=None):
+        self.client.force_authenticate(user or self.user)
+        response = self.client.get(reverse('tasks-list'))
+        if response.status_code == 404:
+            return []
+        return sorted(task['title'] for task in response.data['results'])
+
+    def test_save(self):
+        self.assertEqual(self.titles(), ['Primera'])
+        self.task.title = 'Editada'
+        self.task.save()
+        self.assertEqual(self.titles(), ['Editada'])
+        self.task.title = 'Solo título'
+        self.task.save(update_fields=['title'])
+        self.assertEqual(self.titles(), ['Solo título'])
+
+    def test_create(self):
+        self.assertEqual(self.titles(), ['Primera'])
+        Task.objects.create(owner=self.user, title='Segunda', status='pending')
+        self.assertEqual(self.titles(), ['Primera', 'Segunda'])
+
+    def test_owner_change_invalidates_both_owners(self):
+        self.assertEqual(self.titles(), ['Primera'])
+        self.assertEqual(self.titles(self.other), [])
+        task = Task.objects.get(pk=self.task.pk)
+        task.owner = self.other
+        task.save()
+        self.assertEqual(self.titles(), [])
+        self.assertEqual(self.titles(self.other), ['Primera'])
+
+    def test_queryset_update(self):
+        self.assertEqual(self.titles(), ['Primera'])
+        Task.objects.filter(pk=self.task.pk).update(title='Editada')
+        self.assertEqual(self.titles(), ['Editada'])
+        Task.objects.filter(pk=self.task.pk).update(status='done')
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse('tasks-list')).data['results'][0]['status'],
+                         'done')
+
+    def test_soft_delete_and_restore(self):
+        self.assertEqual(self.titles(), ['Primera'])
+        Task.objects.filter(pk=self.task.pk).soft_delete(deleted_by='Ana')
+        self.client.force_authenticate(self.user)
+        self.assertFalse(self.client.get(reverse('tasks-list')).data['results'][0]['is_active'])
+        Task.objects.filter(pk=self.task.pk).restore(updated_by='Ana')
+        self.assertTrue(self.client.get(reverse('tasks-list')).data['results'][0]['is_active'])
+
+    def test_api_writes_rely_on_the_model_hooks(self):
+        self.assertEqual(self.titles(), ['Primera'])
+        self.client.post(reverse('tasks-archive') + '?status=pending')
+        self.assertFalse(self.client.get(reverse('tasks-list')).data['results'][0]['is_active'])
+        self.client.post(reverse('tasks-restore', args=[self.task.pk]))
+        self.assertTrue(self.client.get(reverse('tasks-list')).data['results'][0]['is_active'])
+
+    def test_bulk_create_and_bulk_update(self):
+        self.assertEqual(self.titles(), ['Primera'])
+        created = Task.objects.bulk_create(
+            [Task(owner=self.user, title=f'Bulk {i}', status='pending') for i in range(2)])
+        self.assertEqual(self.titles(), ['Bulk 0', 'Bulk 1', 'Primera'])
+        for task in created:
+            task.title = task.title.upper()
+        Task.objects.bulk_update(created, ['title'])
+        self.assertEqual(self.titles(), ['BULK 0', 'BULK 1', 'Primera'])
+
+    def test_delete(self):
+        second = Task.objects.create(owner=self.user, title='Segunda', status='pending')
+        self.assertEqual(self.titles(), ['Primera', 'Segunda'])
+        second.delete()
+        self.assertEqual(self.titles(), ['Primera'])
+        Task.objects.filter(pk=self.task.pk).delete()
+        self.assertEqual(self.titles(), [])
+
+    def test_bumps_again_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            Task.objects.filter(pk=self.task.pk).update(title='Editada')
+        # Una lectura entre la escritura y el commit cachea con esta versión
+        version = get_list_cache_version(TASK_LIST_CACHE, self.user.pk)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_list_cache_version(TASK_LIST_CACHE, self.user.pk), version)
+
+
+class TaskRestoreTests(TestCase):
+
+    def setUp(self):
+        get_list_cache().clear()
+        self.user = User.objects.create_user(username='ana', email='ana@example.com')
+        self.task = Task.objects.create(owner=self.user, title='Primera', status='done')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def restore(self):
+        return self.client.post(reverse('tasks-restore', args=[self.task.pk]))
+
+    def test_restores_a_deactivated_task(self):
+        Task.objects.filter(pk=self.task.pk).soft_delete(deleted_by='Ana')
+        self.assertEqual(self.restore().status_code, 200)
+        self.task.refresh_from_db()
+        self.assertTrue(self.task.is_active)
+        self.assertEqual(self.task.status, 'pending')
+
+    def test_active_task_is_left_untouched(self):
+        Task.objects.filter(pk=self.task.pk).update(updated_by='Luis')
+        self.task.refresh_from_db()
+        updated_date = self.task.updated_date
+
+        self.assertEqual(self.restore().status_code, 409)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'done')
+        self.assertEqual(self.task.updated_by, 'Luis')
+        self.assertEqual(self.task.updated_date, updated_date)
+
+
+class TaskSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='ana', email='ana@example.com')
+        cls.in_title = Task.objects.create(owner=cls.user, title='Informe anual',
+                                           description='Resumen', status='pending')
+        cls.in_description = Task.objects.create(owner=cls.user, title='Reunión',
+                                                 description='Preparar el informe', status='done')
+
+    def setUp(self):
+        get_list_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def fts_ids(self, query):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                           f'ORDER BY rowid', [fts5_query(search_terms(query))])
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_search_terms_drop_engine_syntax(self):
+        self.assertEqual(search_terms('"informe\' anual" inf* NEAR(a) -reunión x:y'),
+                         ['informe', 'anual', 'inf', 'near', 'a', 'reunión', 'x', 'y'])
+        self.assertEqual(search_terms(' '.join(f'w{i}' for i in range(20))),
+                         [f'w{i}' for i in range(8)])
+
+    def test_match_expressions(self):
+        terms = search_terms('Near "o\'brien" -x*')
+        self.assertEqual(fts5_query(terms), '"near"* "o"* "brien"* "x"*')
+        self.assertEqual(tsquery(terms), 'near:* & o:* & brien:* & x:*')
+
+    def test_operators_are_searched_as_text(self):
+        for query in ('"informe', 'informe*', 'NEAR(informe anual)', '-informe',
+                      "informe'", 'informe AND'):
+            response = self.client.get(reverse('tasks-search'), {'q': query})
+            self.assertEqual(response.status_code, 200, query)
+        for query in ('*', '"', '-'):
+            response = self.client.get(reverse('tasks-search'), {'q': query})
+            self.assertEqual(response.status_code, 400, query)
+
+    def test_title_matches_rank_first(self):
+        queryset = Task.objects.filter(owner=self.user)
+        self.assertEqual(ranked_ids(queryset, ['infor'], 10),
+                         [self.in_title.pk, self.in_description.pk])
+        self.assertEqual(ranked_ids(queryset, ['informe', 'anual'], 10), [self.in_title.pk])
+        response = self.client.get(reverse('tasks-search'), {'q': 'INFORME'})
+        self.assertEqual([task['id'] for task in response.data['results']],
+                         [self.in_title.pk, self.in_description.pk])
+
+    @skipIf(connection.vendor != 'sqlite', 'FTS5 triggers are SQLite only')
+    def test_triggers_follow_writes(self):
+        if search_backend(connection) is None:
+            self.skipTest('SQLite built without FTS5')
+        created = Task.objects.bulk_create(
+            [Task(owner=self.user, title='Factura', status='pending')])[0]
+        self.assertEqual(self.fts_ids('factura'), [created.pk])
+
+        Task.objects.filter(pk=created.pk).update(title='Presupuesto')
+        self.assertEqual(self.fts_ids('factura'), [])
+        self.assertEqual(self.fts_ids('presupuesto'), [created.pk])
+
+        Task.objects.filter(pk=created.pk).update(description='Factura rectificada')
+        self.assertEqual(self.fts_ids('factura'), [created.pk])
+
+        Task.objects.filter(pk=created.pk).delete()
+        self.assertEqual(self.fts_ids('presupuesto'), [])
+        self.assertEqual(self.fts_ids('factura'), [])
+
+    def test_backend_is_cached_per_alias(self):
+        backend = search_backend(connection)
+        with self.assertNumQueries(0):
+            self.assertEqual(search_backend(connection), backend)
+        if connection.vendor != 'sqlite' or backend is None:
+            return
+        drop_index(connection)
+        self.assertIsNone(search_backend(connection))
+        install_index(connection)
+        self.assertEqual(search_backend(connection), 'sqlite')
+
+
+class TaskFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='ana', email='ana@example.com')
+        base = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        cls.tasks = Task.objects.bulk_create([
+            Task(owner=cls.user, title=f'Task {i}', status=status, is_active=is_active)
+            for i, (status, is_active) in enumerate([
+                ('pending', True), ('done', True), ('pending', False), ('in_progress', True)])])
+        for i, task in enumerate(cls.tasks):
+            Task.objects.filter(pk=task.pk).update(
+                created_date=base + datetime.timedelta(days=i),
+                updated_date=base + datetime.timedelta(days=10 - i))
+
+    def setUp(self):
+        get_list_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def ids(self, **params):
+        return sorted(TaskFilter(params, queryset=Task.objects.all()).qs.values_list('pk', flat=True))
+
+    def pks(self, *indexes):
+        return sorted(self.tasks[i].pk for i in indexes)
+
+    def test_status_and_is_active(self):
+        self.assertEqual(self.ids(status='pending'), self.pks(0, 2))
+        self.assertEqual(self.ids(status='pending', is_active='true'), self.pks(0))
+        self.assertEqual(self.ids(is_active='false'), self.pks(2))
+
+    def test_date_ranges(self):
+        self.assertEqual(self.ids(created_date_after='2024-01-02T00:00:00Z',
+                                  created_date_before='2024-01-03T00:00:00Z'), self.pks(1, 2))
+        self.assertEqual(self.ids(updated_date_before='2024-01-09T00:00:00Z'), self.pks(2, 3))
+
+    def test_ordering(self):
+        response = self.client.get(reverse('tasks-list'), {'ordering': 'updated_date'})
+        self.assertEqual([task['id'] for task in response.data['results']],
+                         [task.pk for task in reversed(self.tasks)])
+        response = self.client.get(reverse('tasks-list'), {'ordering': '-created_date'})
+        self.assertEqual([task['id'] for task in response.data['results']],
+                         [task.pk for task in reversed(self.tasks)])
+
+    def test_invalid_values_are_rejected(self):
+        for params in ({'ordering': 'title'}, {'ordering': '-description'},
+                       {'ordering': 'owner__password'}, {'status': 'unknown'},
+                       {'created_date_after': 'ayer'}):
+            response = self.client.get(reverse('tasks-list'), params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+class TaskCounterTests(TestCase):
+    """Every write path keeps TaskStatusCount equal to the tasks table."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='ana', email='ana@example.com')
+        self.other = User.objects.create_user(username='luis', email='luis@example.com')
+
+    def assertCountersInSync(self):
+        call_command('reconcile_task_stats', '--check', stdout=io.StringIO())
+
+    def counts(self, owner=None):
+        return {(status, is_active): count for status, is_active, count in
+                TaskStatusCount.objects.filter(owner=owner or self.user, count__gt=0)
+                .values_list('status', 'is_active', 'count')}
+
+    def test_drift_is_detected(self):
+        Task.objects.create(owner=self.user, title='Primera', status='pending')
+        TaskStatusCount.objects.update(count=5)
+        with self.assertRaises(CommandError):
+            self.assertCountersInSync()
+        call_command('reconcile_task_stats', stdout=io.StringIO())
+        self.assertCountersInSync()
+
+    def test_create_and_save(self):
+        task = Task.objects.create(owner=self.user, title='Primera', status='pending')
+        self.assertEqual(self.counts(), {('pending', True): 1})
+        self.assertCountersInSync()
+
+        task.status = 'done'
+        task.save()
+        self.assertEqual(self.counts(), {('done', True): 1})
+        self.assertCountersInSync()
+
+        # Instancia cargada sin los campos del contador
+        task = Task.objects.only('title').get(pk=task.pk)
+        task.owner = self.other
+        task.save()
+        self.assertEqual(self.counts(), {})
+        self.assertEqual(self.counts(self.other), {('done', True): 1})
+        self.assertCountersInSync()
+
+        task.title = 'Solo título'
+        task.save(update_fields=['title'])
+        self.assertCountersInSync()
+
+    def test_save_of_a_stale_instance(self):
+        task = Task.objects.create(owner=self.user, title='Primera', status='pending')
+        stale = Task.objects.get(pk=task.pk)
+        # Otra petición cambia la fila después de cargarla
+        Task.objects.filter(pk=task.pk).update(status='done')
+        stale.status = 'in_progress'
+        stale.save()
+        self.assertEqual(self.counts(), {('in_progress', True): 1})
+        self.assertCountersInSync()
+
+        Task.objects.filter(pk=task.pk).update(is_active=False)
+        stale.delete()
+        self.assertEqual(self.counts(), {})
+        self.assertCountersInSync()
+
+    def test_writes_lock_the_rows_they_count(self):
+        task = Task.objects.create(owner=self.user, title='Primera', status='pending')
+        # En SQLite FOR UPDATE no se emite: se comprueba que se pide
+        for write in (lambda: task.save(),
+                      lambda: Task.objects.filter(pk=task.pk).update(status='done'),
+                      lambda: Task.objects.filter(pk=task.pk).update(status=Value('pending')),
+                      lambda: task.delete(),
+                      lambda: Task.objects.filter(owner=self.user).delete()):
+            with mock.patch.object(QuerySet, 'select_for_update', autospec=True,
+                                   side_effect=QuerySet.select_for_update) as select_for_update:
+                write()
+            select_for_update.assert_called_once()
+        self.assertCountersInSync()
+
+    def test_status_update(self):
+        Task.objects.bulk_create(
+            [Task(owner=self.user, title=f'Task {i}', status='pending') for i in range(3)])
+        Task.objects.filter(owner=self.user).update(status='in_progress')
+        self.assertEqual(self.counts(), {('in_progress', True): 3})
+        self.assertCountersInSync()
+
+    def test_soft_delete_and_restore(self):
+        tasks = Task.objects.bulk_create(
+            [Task(owner=self.user, title=f'Task {i}', status='pending') for i in range(3)])
+        Task.objects.filter(pk__in=[task.pk for task in tasks[:2]]).soft_delete(
+            deleted_by='Ana', status='archived')
+        self.assertEqual(self.counts(), {('pending', True): 1, ('archived', False): 2})
+        self.assertCountersInSync()
+
+        Task.objects.filter(pk=tasks[0].pk).restore(updated_by='Ana', status='pending')
+        self.assertEqual(self.counts(), {('pending', True): 2, ('archived', False): 1})
+        self.assertCountersInSync()
+
+    def test_bulk_create_and_bulk_update(self):
+        tasks = Task.objects.bulk_create(
+            [Task(owner=self.user, title=f'Task {i}', status='pending') for i in range(4)] +
+            [Task(owner=self.other, title='Otra', status='done')])
+        self.assertEqual(self.counts(), {('pending', True): 4})
+        self.assertCountersInSync()
+
+        for task in tasks[:2]:
+            task.status = 'done'
+        tasks[2].owner = self.other
+        Task.objects.bulk_update(tasks[:3], ['status', 'owner'])
+        self.assertEqual(self.counts(), {('pending', True): 1, ('done', True): 2})
+        self.assertEqual(self.counts(self.other), {('done', True): 1, ('pending', True): 1})
+        self.assertCountersInSync()
+
+        # Segundo bulk_update con las mismas instancias: ya no hay cambios
+        Task.objects.bulk_update(tasks[:3], ['status', 'owner'])
+        self.assertCountersInSync()
+
+    def test_hard_delete(self):
+        tasks = Task.objects.bulk_create(
+            [Task(owner=self.user, title=f'Task {i}', status='pending') for i in range(3)])
+        tasks[0].delete()
+        self.assertEqual(self.counts(), {('pending', True): 2})
+        self.assertCountersInSync()
+
+        Task.objects.filter(owner=self.user).delete()
+        self.assertEqual(self.counts(), {})
+        self.assertCountersInSync()
+
+    def test_api_writes(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        task = {'title': 'Nueva', 'description': 'Texto', 'status': 'pending', 'owner': self.user.pk}
+        client.post(reverse('tasks-bulk-create'), [task] * 3, format='json')
+        pk = Task.objects.values_list('pk', flat=True).first()
+        client.patch(reverse('tasks-detail', kwargs={'pk': pk}), {'status': 'done'}, format='json')
+        client.delete(reverse('tasks-detail', kwargs={'pk': pk}))
+        client.post(reverse('tasks-archive') + '?status=pending')
+        self.assertEqual(self.counts(), {('archived', False): 3})
+        self.assertCountersInSync()
+
+
+@override_settings(TASK_CHANGES_SETTLE_SECONDS=0)
+class TaskChangesFeedTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='ana', email='ana@example.com')
+        base = timezone.now() - datetime.timedelta(minutes=10)
+        self.tasks = Task.objects.bulk_create(
+            [Task(owner=self.user, title=f'Task {i}', status='pending') for i in range(3)])
+        for i, task in enumerate(self.tasks):
+            Task.objects.filter(pk=task.pk).update(
+                updated_date=base + datetime.timedelta(minutes=i))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def changes(self, **params):
+        response = self.client.get(reverse('tasks-changes'), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_full_sync_then_nothing_new(self):
+        data = self.changes()
+        self.assertEqual([task['id'] for task in data['results']],
+                         [task.pk for task in self.tasks])
+        self.assertFalse(data['has_more'])
+        again = self.changes(since=data['since'])
+        self.assertEqual(again['results'], [])
+        self.assertEqual(again['since'], data['since'])
+
+    def test_pages_follow_the_since_cursor(self):
+        first = self.changes(page_size=2)
+        self.assertTrue(first['has_more'])
+        second = self.changes(page_size=2, since=first['since'])
+        self.assertFalse(second['has_more'])
+        self.assertEqual([task['id'] for task in first['results'] + second['results']],
+                         [task.pk for task in self.tasks])
+
+    def test_updates_come_back_once(self):
+        since = self.changes()['since']
+        Task.objects.filter(pk=self.tasks[0].pk).update(
+            title='Editada', updated_date=timezone.now() - datetime.timedelta(seconds=1))
+        data = self.changes(since=since)
+        self.assertEqual([(task['id'], task['title']) for task in data['results']],
+                         [(self.tasks[0].pk, 'Editada')])
+
+    def test_soft_deleted_tasks_are_tombstones(self):
+        since = self.changes()['since']
+        Task.objects.filter(pk=self.tasks[1].pk).soft_delete(deleted_by='Ana')
+        Task.objects.filter(pk=self.tasks[1].pk).update(
+            updated_date=timezone.now() - datetime.timedelta(seconds=1))
+        [tombstone] = self.changes(since=since)['results']
+        self.assertEqual(set(tombstone), {'id', 'is_active', 'deleted_date'})
+        self.assertEqual((tombstone['id'], tombstone['is_active']), (self.tasks[1].pk, False))
+        self.assertIsNotNone(tombstone['deleted_date'])
+
+    @override_settings(TASK_CHANGES_SETTLE_SECONDS=60)
+    def test_rows_inside_the_settle_window_wait(self):
+        since = self.changes()['since']
+        Task.objects.filter(pk=self.tasks[0].pk).update(
+            title='Reciente', updated_date=timezone.now())
+        data = self.changes(since=since)
+        self.assertEqual(data['results'], [])
+        self.assertEqual(data['since'], since)
+
+        Task.objects.filter(pk=self.tasks[0].pk).update(
+            updated_date=timezone.now() - datetime.timedelta(seconds=61))
+        self.assertEqual([task['title'] for task in self.changes(since=since)['results']],
+                         ['Reciente'])
+
+    def test_invalid_since(self):
+        response = self.client.get(reverse('tasks-changes'), {'since': 'no-es-un-cursor'})
+        self.assertEqual(response.status_code, 404)
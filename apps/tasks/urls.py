@@ -1,10 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from apps.tasks.views.views import TaskViewset
+from apps.tasks.views.async_views import TaskAsyncDetailView, TaskAsyncListView
 
 router = DefaultRouter()
 router.register(r'tasks', TaskViewset, basename='tasks')
 
 urlpatterns = [
+    # Lecturas asíncronas (ASGI)
+    path('async/tasks/', TaskAsyncListView.as_view(), name='tasks-async-list'),
+    path('async/tasks/<int:pk>/', TaskAsyncDetailView.as_view(), name='tasks-async-detail'),
     path('', include(router.urls))
 ]
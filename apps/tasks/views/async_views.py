@@ -0,0 +1,62 @@
+# Async (ASGI) read endpoints for tasks
+
+# Django imports
+from django.shortcuts import aget_object_or_404
+from django.utils.translation import gettext_lazy as _
+
+# DRF imports
+from django_filters.utils import translate_validation
+from rest_framework.exceptions import NotFound, PermissionDenied
+
+# API imports
+from apps.base.async_views import AsyncAPIView
+from apps.base.pagination import KeysetPagination
+from apps.base.serializer import ValuesSerializer
+from apps.tasks.filters import TaskFilter
+from apps.tasks.models import Task
+from apps.tasks.serializer.task_serializer import TaskListSerializer
+
+
+class TaskAsyncMixin:
+    values = ValuesSerializer.for_serializer(TaskListSerializer)
+
+    def get_queryset(self):
+        return Task.objects.filter(owner=self.request.user)
+
+
+class TaskAsyncListView(TaskAsyncMixin, AsyncAPIView):
+    """
+    Async version of ``TaskViewset.list``: same filters, keyset pagination
+    and response body, without tying up a thread per request under ASGI.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        filterset = TaskFilter(self.request.query_params,
+                               queryset=self.get_queryset(), request=self.request)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        queryset = filterset.qs
+
+        paginator = KeysetPagination()
+        columns = list(self.values.columns)
+        columns += [column for column in paginator.get_row_columns(queryset)
+                    if column not in columns]
+        rows = await paginator.apaginate_queryset(
+            queryset.values(*columns), self.request)
+
+        if not rows:
+            raise NotFound(_("No tienes tareas asignadas."))
+        return self.render(paginator.get_paginated_response(
+            self.values.serialize(rows)).data)
+
+
+class TaskAsyncDetailView(TaskAsyncMixin, AsyncAPIView):
+    """Async version of ``TaskViewset.retrieve``."""
+
+    async def get(self, request, pk, *args, **kwargs):
+        row = await aget_object_or_404(
+            self.get_queryset().values(*self.values.columns), pk=pk)
+        if not row['is_active']:
+            raise PermissionDenied(
+                _("La tarea solicitada está desactivada o fue eliminada."))
+        return self.render(self.values.serialize([row])[0])
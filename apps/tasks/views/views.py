@@ -1,13 +1,19 @@
 # Create your views here
+from datetime import timedelta
 
 # Django imports
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from django.shortcuts import render
 from django.utils.translation import gettext_lazy as _
 
 # DRF imports
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework.permissions import IsAuthenticated
 
 # Swagger imports
@@ -15,8 +21,19 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 # API imports
-from apps.base.views import BaseModelViewSet
-from apps.tasks.models import Task
+from apps.base.utils import get_user_fullname
+from apps.base.cache import ListCacheMixin
+from apps.base.pagination import ChangesPagination, KeysetPagination, RankedPagination
+from apps.base.views import (
+    BaseModelViewSet,
+    ConditionalGetMixin,
+    FastReadMixin,
+    SparseFieldsMixin,
+    StreamingExportMixin
+)
+from apps.tasks.filters import TaskFilter
+from apps.tasks.models import TASK_LIST_CACHE, Task, TaskStatusCount
+from apps.tasks.search import ranked_ids, search_terms
 from tasks.serializer.task_serializer import (
     TaskListSerializer,
     TaskCreateSerializer,
@@ -24,7 +41,8 @@ from tasks.serializer.task_serializer import (
 )
 
 
-class TaskViewset(BaseModelViewSet):
+class TaskViewset(ConditionalGetMixin, ListCacheMixin, SparseFieldsMixin,
+                  FastReadMixin, StreamingExportMixin, BaseModelViewSet):
     """
     API endpoint that allows tasks to be viewed or edited.
     """
@@ -32,16 +50,29 @@ class TaskViewset(BaseModelViewSet):
     queryset = Task.objects.filter(is_active=True)
     permission_classes = [IsAuthenticated]
     serializer_class = TaskListSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TaskFilter
+    pagination_class = KeysetPagination
+    list_cache_namespace = TASK_LIST_CACHE
+    export_filename = 'tasks'
+    sparse_required_fields = ('is_active',)
 
     def get_queryset(self):
         return Task.objects.filter(owner=self.request.user)
 
+    def get_object(self):
+        instance = super().get_object()
+        if self.action == 'retrieve' and not instance.is_active:
+            raise PermissionDenied(
+                _("La tarea solicitada está desactivada o fue eliminada."))
+        return instance
+
     def get_serializer_class(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'export', 'search', 'changes']:
             return TaskListSerializer
-        if self.action in ['create']:
+        if self.action in ['create', 'bulk_create']:
             return TaskCreateSerializer
-        if self.action in ['update', 'partial_update']:
+        if self.action in ['update', 'partial_update', 'bulk_update']:
             return TaskUpdateSerializer
         return self.serializer_class
 
@@ -55,7 +86,7 @@ class TaskViewset(BaseModelViewSet):
 
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
-        if isinstance(response, Response) and not response.data:
+        if isinstance(response, Response) and not response.data.get('results'):
             return Response(
                 {"detail": _("No tienes tareas asignadas.")},
                 status=status.HTTP_404_NOT_FOUND
@@ -72,15 +103,7 @@ class TaskViewset(BaseModelViewSet):
 
     def retrieve(self, request, *args, **kwargs):
         try:
-            instance = self.get_object()
-            if not instance.is_active:
-                return Response(
-                    {"detail": _(
-                        "La tarea solicitada está desactivada o fue eliminada.")},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            serializer = self.get_serializer(instance)
-            return Response(serializer.data)
+            return super().retrieve(request, *args, **kwargs)
         except NotFound:
             raise NotFound({"detail": _("Tarea no encontrada.")})
 
@@ -97,7 +120,7 @@ class TaskViewset(BaseModelViewSet):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            self.perform_create(serializer)
             return Response({'message': 'Task created successfuly', 'data': serializer.data},
                             status=status.HTTP_201_CREATED)
         return Response({'message': 'task could not be created', 'error': serializer.errors},
@@ -122,9 +145,11 @@ class TaskViewset(BaseModelViewSet):
         serializer = self.get_serializer(
             instance, data=request.data, partial=partial)
         if serializer.is_valid():
-            serializer.save()
+            self.perform_update(serializer)
             return Response({'message': 'Task successfuly updated', 'data': serializer.data},
                             status=status.HTTP_200_OK)
+        return Response({'message': 'task could not be updated', 'error': serializer.errors},
+                        status=status.HTTP_400_BAD_REQUEST)
 
     swagger_auto_schema(
         operation_description=_(
@@ -140,11 +165,289 @@ class TaskViewset(BaseModelViewSet):
     def destroy(self, request, *args, **kwargs):
         try:
             instance = self.get_object()
-            if instance.is_active:
-                instacnce.is_active = False
-                instance.status = 'archived'
-                instance.save()
-                return Response({'message': 'Task deactivaded and archived successfuly'},
-                                status=status.HTTP_200_OK)
-        except:
+        except Exception:
             return Response({"detail": _("Tarea no encontrada.")}, status=status.HTTP_404_NOT_FOUND)
+        if not instance.is_active:
+            return Response(
+                {"detail": _(
+                    "La tarea solicitada está desactivada o fue eliminada.")},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        self.perform_destroy(instance)
+        return Response({'message': 'Task deactivaded and archived successfuly'},
+                        status=status.HTTP_200_OK)
+
+    def get_soft_delete_fields(self):
+        return {'status': 'archived'}
+
+    def get_changes_queryset(self):
+        # Las filas más recientes que el margen pueden tener todavía
+        # transacciones anteriores sin confirmar; se entregan en la próxima
+        # llamada para que el cursor nunca salte un cambio.
+        settle = getattr(settings, 'TASK_CHANGES_SETTLE_SECONDS', 1)
+        return self.get_queryset().filter(
+            updated_date__lt=timezone.now() - timedelta(seconds=settle))
+
+    def get_bulk_items(self, request, key=None):
+        items = request.data.get(key) if key else request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError(
+                {'detail': _('Se esperaba una lista no vacía.')})
+        max_items = getattr(settings, 'TASK_BULK_MAX_ITEMS', 1000)
+        if len(items) > max_items:
+            raise ValidationError(
+                {'detail': _('Máximo %(max)s elementos por petición.') % {'max': max_items}})
+        return items
+
+    swagger_auto_schema(
+        operation_description=_('Create several tasks in one request'),
+        responses={
+            201: _('Tasks created successfuly'),
+            400: _('Invalid data, errors are reported per item')
+        }
+    )
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request, *args, **kwargs):
+        items = self.get_bulk_items(request)
+        serializer = self.get_serializer(data=items, many=True)
+        if not serializer.is_valid():
+            return Response({'message': 'tasks could not be created', 'error': serializer.errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            self.perform_create(serializer)
+        results = [{'index': index, 'id': task.pk}
+                   for index, task in enumerate(serializer.instance)]
+        return Response({'message': 'Tasks created successfuly', 'data': results},
+                        status=status.HTTP_201_CREATED)
+
+    swagger_auto_schema(
+        operation_description=_('Update several tasks in one request'),
+        responses={
+            200: _('Tasks successfuly updated'),
+            400: _('Invalid data, errors are reported per item')
+        }
+    )
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request, *args, **kwargs):
+        items = self.get_bulk_items(request)
+        ids = [item.get('id') if isinstance(item, dict) else None
+               for item in items]
+        tasks = self.get_queryset().in_bulk(
+            [pk for pk in ids if isinstance(pk, int)])
+
+        errors = []
+        for pk in ids:
+            task = tasks.get(pk)
+            if task is None:
+                errors.append({'id': [_('Tarea no encontrada.')]})
+            elif not task.is_active:
+                errors.append(
+                    {'id': [_('The Task do you want to update is not active or already deleted')]})
+            else:
+                errors.append({})
+        if any(errors):
+            return Response({'message': 'tasks could not be updated', 'error': errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(
+            [tasks[pk] for pk in ids], data=items, many=True, partial=True)
+        if not serializer.is_valid():
+            return Response({'message': 'tasks could not be updated', 'error': serializer.errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            self.perform_update(serializer)
+        results = [{'index': index, 'id': pk} for index, pk in enumerate(ids)]
+        return Response({'message': 'Tasks successfuly updated', 'data': results},
+                        status=status.HTTP_200_OK)
+
+    swagger_auto_schema(
+        operation_description=_('Deactivate and archive several tasks in one request'),
+        responses={
+            200: _('Tasks deactivaded and archived successfuly'),
+            400: _('Invalid data')
+        }
+    )
+
+    @action(detail=False, methods=['post'], url_path='bulk-archive')
+    def bulk_archive(self, request, *args, **kwargs):
+        ids = self.get_bulk_items(request, key='ids')
+        queryset = self.get_queryset().filter(
+            is_active=True, pk__in=[pk for pk in ids if isinstance(pk, int)])
+
+        with transaction.atomic():
+            archived = set(queryset.values_list('pk', flat=True))
+            Task.objects.filter(pk__in=archived).soft_delete(
+                deleted_by=self.get_deleted_by(),
+                **self.get_soft_delete_fields()
+            )
+
+        results = [{'index': index, 'id': pk,
+                    'archived': pk in archived}
+                   for index, pk in enumerate(ids)]
+        return Response({'message': 'Tasks deactivaded and archived successfuly', 'data': results},
+                        status=status.HTTP_200_OK)
+
+    swagger_auto_schema(
+        operation_description=_('Deactivate and archive every active task matching the filters'),
+        manual_parameters=[
+            openapi.Parameter('status', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=[choice for choice, _label in Task.STATUS_CHOICES])
+        ],
+        responses={
+            200: _('Tasks deactivaded and archived successfuly'),
+            400: _('Invalid data')
+        }
+    )
+
+    @action(detail=False, methods=['post'], url_path='archive')
+    def archive(self, request, *args, **kwargs):
+        if not request.query_params.get('status'):
+            raise ValidationError({'status': _('Estado inválido.')})
+        # Un solo UPDATE sobre todas las tareas que cumplen los filtros
+        archived = self.filter_queryset(self.get_queryset()).filter(
+            is_active=True).soft_delete(
+                deleted_by=self.get_deleted_by(),
+                **self.get_soft_delete_fields()
+        )
+        return Response({'message': 'Tasks deactivaded and archived successfuly', 'archived': archived},
+                        status=status.HTTP_200_OK)
+
+    swagger_auto_schema(
+        operation_description=_('Export all tasks as a streamed JSON array or NDJSON'),
+        manual_parameters=[
+            openapi.Parameter('type', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=['json', 'ndjson'], default='json')
+        ],
+        responses={
+            200: TaskListSerializer(many=True),
+            400: _('Invalid export type')
+        }
+    )
+
+    @action(detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.ordered:
+            queryset = queryset.order_by('-created_date', '-id')
+        return self.stream_export(request, queryset)
+
+    swagger_auto_schema(
+        operation_description=_('Full-text search over title and description, best match first'),
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER)
+        ],
+        responses={
+            200: TaskListSerializer(many=True),
+            400: _('Empty search query')
+        }
+    )
+
+    @action(detail=False, methods=['get'])
+    def search(self, request, *args, **kwargs):
+        terms = search_terms(request.query_params.get('q'))
+        if not terms:
+            raise ValidationError(
+                {'q': _('Indica al menos un término de búsqueda.')})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = RankedPagination()
+        ids = paginator.paginate_ids(
+            lambda limit, offset: ranked_ids(queryset, terms, limit, offset), request)
+
+        values = self.get_values_serializer()
+        if values is not None:
+            rows = {row['id']: row for row in queryset.filter(
+                pk__in=ids).values('id', *values.columns)}
+            data = values.serialize(rows[pk] for pk in ids if pk in rows)
+        else:
+            tasks = queryset.in_bulk(ids)
+            data = self.get_serializer(
+                [tasks[pk] for pk in ids if pk in tasks], many=True).data
+        return paginator.get_paginated_response(data)
+
+    swagger_auto_schema(
+        operation_description=_('Number of tasks per status, active and inactive'),
+        responses={
+            200: _('Task counters of the current user')
+        }
+    )
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request, *args, **kwargs):
+        # Lee la tabla de contadores: una fila por (estado, activo)
+        by_status = {choice: {'active': 0, 'inactive': 0}
+                     for choice, _label in Task.STATUS_CHOICES}
+        counts = TaskStatusCount.objects.filter(owner=request.user).values_list(
+            'status', 'is_active', 'count')
+        for task_status, is_active, count in counts:
+            bucket = by_status.setdefault(task_status, {'active': 0, 'inactive': 0})
+            bucket['active' if is_active else 'inactive'] += count
+
+        active = sum(bucket['active'] for bucket in by_status.values())
+        inactive = sum(bucket['inactive'] for bucket in by_status.values())
+        return Response({'total': active + inactive, 'active': active,
+                         'inactive': inactive, 'by_status': by_status},
+                        status=status.HTTP_200_OK)
+
+    swagger_auto_schema(
+        operation_description=_(
+            'Tasks created, updated or deleted since the given high-water mark, oldest first. '
+            'Deleted tasks are returned as tombstones'),
+        manual_parameters=[
+            openapi.Parameter('since', openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER)
+        ],
+        responses={
+            200: TaskListSerializer(many=True),
+            404: _('Invalid cursor')
+        }
+    )
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request, *args, **kwargs):
+        queryset = self.get_changes_queryset()
+        paginator = ChangesPagination()
+        values = self.get_values_serializer()
+        if values is not None:
+            columns = list(values.columns)
+            columns += [column for column in ['id', 'is_active', 'updated_date']
+                        if column not in columns]
+            rows = paginator.paginate_queryset(queryset.values(*columns), request, view=self)
+            items = values.serialize(rows)
+        else:
+            rows = paginator.paginate_queryset(queryset, request, view=self)
+            items = self.get_serializer(rows, many=True).data
+
+        results = []
+        for row, item in zip(rows, items):
+            if paginator.row_value(row, 'is_active'):
+                results.append(item)
+            else:
+                results.append({'id': paginator.row_value(row, 'id'), 'is_active': False,
+                                'deleted_date': item.get('deleted_date')})
+        return paginator.get_paginated_response(results)
+
+    swagger_auto_schema(
+        operation_description=_('Restore a deactivated task'),
+        responses={
+            200: _('Task restored successfuly'),
+            404: _('Task not found'),
+            409: _('Task is already active')
+        }
+    )
+
+    @action(detail=True, methods=['post'])
+    def restore(self, request, *args, **kwargs):
+        instance = self.get_object()
+        # El filtro is_active=False evita pisar una tarea restaurada a la vez
+        restored = not instance.is_active and Task.objects.filter(
+            pk=instance.pk, is_active=False).restore(
+            updated_by=get_user_fullname(request.user), status='pending')
+        if not restored:
+            return Response({'error': _('The Task do you want to restore is already active')},
+                            status=status.HTTP_409_CONFLICT)
+        return Response({'message': 'Task restored successfuly'},
+                        status=status.HTTP_200_OK)
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:08
+
+import apps.users.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', apps.users.models.UserManager()),
+            ],
+        ),
+    ]
@@ -1,7 +1,35 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import AbstractUser
-from apps.base.models import AuditableMixins
+from django.contrib.auth.models import UserManager as BaseUserManager
+from apps.authentication.cache import user_cache
+from apps.base.models import AuditableMixins, AuditableQuerySet
+
+
+def evict_cached_users(pks):
+    for pk in pks:
+        user_cache.delete(str(pk))
+
+
+class UserQuerySet(AuditableQuerySet):
+    """
+    update() (and so soft_delete, restore and bulk_update) does not send
+    post_save: the updated users are evicted from the auth cache here, and
+    again on commit in case a request cached the old row meanwhile.
+    """
+
+    def update(self, **kwargs):
+        pks = list(self.values_list('pk', flat=True))
+        rows = super().update(**kwargs)
+        evict_cached_users(pks)
+        transaction.on_commit(lambda: evict_cached_users(pks), using=self.db)
+        return rows
+
+    update.alters_data = True
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    pass
 
 
 class User(AuditableMixins, AbstractUser):
@@ -10,6 +38,8 @@ class User(AuditableMixins, AbstractUser):
     last_name = models.CharField(_('last name'), max_length=150)
     is_active = models.BooleanField(_('active'), default=True)
 
+    objects = UserManager()
+
     class Meta:
         verbose_name = _('user')
         verbose_name_plural = _('Users')
@@ -1,3 +1,92 @@
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.authentication.authentication import JWTAuthentication
+from apps.authentication.cache import token_cache, user_cache
+from apps.authentication.utils import generate_access_token
+from apps.base.serializer import ValuesSerializer
+from apps.users.models import User
+from apps.users.serializer.user_serializer import UserListSerializer
+
+
+class UserListSerializerParityTests(TestCase):
+    """The ValuesSerializer fast path must render the same JSON bytes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='root', email='root@example.com', password='secret-pass')
+        User.objects.create_user(
+            username='ana', email='ana@example.com', password='secret-pass',
+            first_name='Ana', last_name='Pérez', created_by='root')
+        User.objects.create_user(
+            username='bo', email='bo@example.com', password='secret-pass',
+            first_name='Bo', last_name='')
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_values_rows_render_identically(self):
+        queryset = User.objects.order_by('id')
+        values = ValuesSerializer.for_serializer(UserListSerializer)
+        self.assertTrue(values.supported)
+        self.assertEqual(
+            self.render(values.serialize(queryset.values(*values.columns))),
+            self.render(UserListSerializer(queryset, many=True).data))
+
+    def test_list_endpoint_matches_serializer(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/user/users/')
+        self.assertEqual(response.status_code, 200)
+        # Sin paginación: la lista de usuarios sigue siendo un array
+        queryset = User.objects.filter(is_active=True)
+        self.assertEqual(
+            self.render(response.data),
+            self.render(UserListSerializer(queryset, many=True).data))
+
+
+class UserSoftDeleteTests(TestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user(username='ana', email='ana@example.com')
+        self.token = generate_access_token(self.user)
+
+    def authenticate(self):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        return JWTAuthentication().authenticate(request)
+
+    def test_soft_delete_evicts_cached_user(self):
+        self.authenticate()
+        self.assertIsNotNone(user_cache.get(str(self.user.pk)))
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).soft_delete(deleted_by='Admin')
+        self.assertIsNone(user_cache.get(str(self.user.pk)))
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_restore_evicts_cached_user(self):
+        User.objects.filter(pk=self.user.pk).soft_delete(deleted_by='Admin')
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+        User.objects.filter(pk=self.user.pk).restore(updated_by='Admin')
+        user, _token = self.authenticate()
+        self.assertTrue(user.is_active)
+        self.assertIsNone(user.deleted_date)
+
+    def test_archived_user_is_rejected_at_once(self):
+        admin = User.objects.create_user(username='admin', email='admin@example.com',
+                                         is_staff=True)
+        self.authenticate()
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.delete(reverse('users-detail', kwargs={'pk': self.user.pk}))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_active)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from apps.users.views.views import *
+from apps.users.views.async_views import UserAsyncDetailView
 
 
 router = DefaultRouter()
@@ -8,5 +9,7 @@ router.register(r'users', UserViewSet, basename='users')
 
 
 urlpatterns = [
+    # Lectura asíncrona (ASGI)
+    path('async/users/<int:pk>/', UserAsyncDetailView.as_view(), name='users-async-detail'),
     path('', include(router.urls)),
 ]
@@ -0,0 +1,22 @@
+from django.shortcuts import aget_object_or_404
+
+# models and serializers
+from apps.users.models import User
+from apps.users.serializer.user_serializer import UserListSerializer
+
+# async base view
+from apps.base.async_views import AsyncAPIView
+from apps.base.serializer import ValuesSerializer
+
+
+class UserAsyncDetailView(AsyncAPIView):
+    """
+    Async version of ``UserViewSet.retrieve``
+    """
+
+    values = ValuesSerializer.for_serializer(UserListSerializer)
+
+    async def get(self, request, pk, *args, **kwargs):
+        row = await aget_object_or_404(
+            User.objects.filter(is_active=True).values(*self.values.columns), pk=pk)
+        return self.render(self.values.serialize([row])[0])
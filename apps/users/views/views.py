@@ -14,10 +14,15 @@ from apps.users.serializer.user_serializer import *
 from apps.users.models import User
 
 # viewser base
-from apps.base.views import BaseModelViewSet
+from apps.base.views import (
+    BaseModelViewSet,
+    ConditionalGetMixin,
+    FastReadMixin,
+    SparseFieldsMixin
+)
 
 
-class UserViewSet(BaseModelViewSet):
+class UserViewSet(ConditionalGetMixin, SparseFieldsMixin, FastReadMixin, BaseModelViewSet):
     """
     API endpoints for managment of users
     """
@@ -0,0 +1,117 @@
+"""
+Compares the async task read endpoints with the sync DRF ones under
+concurrent load, driving the ASGI and WSGI handlers in-process:
+
+- async_asgi: /task/async/tasks/ through the ASGI handler (event loop)
+- sync_asgi:  /task/tasks/ through the ASGI handler (sync view in a thread)
+- sync_wsgi:  /task/tasks/ through the WSGI handler from a thread pool
+
+    python -m benchmarks.bench_async --tasks 2000 --concurrency 50 --requests 20
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import emit, setup_django, summarize
+
+
+def seed(count):
+    from apps.authentication.utils import generate_access_token
+    from apps.tasks.models import Task
+    from apps.users.models import User
+
+    user = User.objects.create_user(
+        username='bench', email='bench@example.com', password='bench-pass',
+        first_name='Bench', last_name='User')
+    Task.objects.bulk_create(
+        [Task(owner=user, title=f'Task {i}', description='x' * 200,
+              status='pending', created_by='Bench User')
+         for i in range(count)],
+        batch_size=1000)
+    return generate_access_token(user)
+
+
+async def run_asgi(path, headers, concurrency, requests):
+    from django.test import AsyncClient
+
+    latencies = []
+
+    async def worker():
+        client = AsyncClient()
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, (response.status_code, response.content)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def run_wsgi(path, headers, concurrency, requests):
+    from django.db import connection
+    from django.test import Client
+
+    latencies = []
+
+    def worker():
+        client = Client(headers=headers)
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = client.get(path)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, (response.status_code, response.content)
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=20,
+                        help='Requests per concurrent client.')
+    parser.add_argument('--page-size', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+
+    settings.ALLOWED_HOSTS = ['*']
+    # La cache de listas ocultaría el coste de la vista
+    settings.LIST_RESPONSE_CACHE = dict(settings.LIST_RESPONSE_CACHE, TIMEOUT=0)
+
+    token = seed(args.tasks)
+    headers = {'Authorization': f'Bearer {token}'}
+    query = f'?page_size={args.page_size}'
+
+    results = {
+        'async_asgi': asyncio.run(run_asgi(
+            f'/task/async/tasks/{query}', headers, args.concurrency, args.requests)),
+        'sync_asgi': asyncio.run(run_asgi(
+            f'/task/tasks/{query}', headers, args.concurrency, args.requests)),
+        'sync_wsgi': run_wsgi(
+            f'/task/tasks/{query}', headers, args.concurrency, args.requests),
+    }
+    emit({
+        'benchmark': 'task_list_async_vs_sync',
+        'tasks': args.tasks,
+        'concurrency': args.concurrency,
+        'requests_per_client': args.requests,
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""
+Load test of the auth and task API. Concurrent workers repeat the flow
+login -> list -> create -> update -> destroy, each flow as a different
+seeded user, and the per-step throughput, latency percentiles and latency
+histograms are printed as JSON.
+
+In-process (WSGI handler, throwaway test database):
+
+    python -m benchmarks.bench_flows --users 50 --tasks 5000 --workers 8 --flows 20
+    python -m benchmarks.bench_flows --database postgresql --users 200 --tasks 100000
+
+Against a running server (seeds the server's configured database with
+``bench-*`` users and removes them at the end):
+
+    python -m benchmarks.bench_flows --server http://127.0.0.1:8000 --workers 16
+
+Login cost is dominated by the password hash: ``--hash-iterations`` sets
+the PBKDF2 iterations in-process; against a server the server's
+PASSWORD_HASHING applies.
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from benchmarks.common import emit, histogram, setup_django, summarize
+
+STEPS = ('login', 'list', 'create', 'update', 'destroy')
+# Un usuario sin tareas recibe 404 en el listado (comportamiento de la API)
+EXPECTED_STATUS = {'login': {200}, 'list': {200, 404}, 'create': {201},
+                   'update': {200}, 'destroy': {200}}
+USERNAME_PREFIX = 'bench-'
+PASSWORD = 'Bench-pass-123'
+
+
+def seed(users, tasks):
+    from django.contrib.auth.hashers import make_password
+
+    from apps.tasks.models import Task
+    from apps.users.models import User
+
+    User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+    # Un único hash para todos: sembrar no debe costar un PBKDF2 por usuario
+    password = make_password(PASSWORD)
+    accounts = User.objects.bulk_create(
+        [User(username=f'{USERNAME_PREFIX}{i}', email=f'{USERNAME_PREFIX}{i}@example.com',
+              password=password, first_name='Bench', last_name=f'User {i}')
+         for i in range(users)],
+        batch_size=1000)
+    statuses = ['pending', 'in_progress', 'done']
+    Task.objects.bulk_create(
+        [Task(owner=accounts[i % users], title=f'Task {i}', description='x' * 200,
+              status=statuses[i % len(statuses)], created_by='Bench User')
+         for i in range(tasks)],
+        batch_size=1000)
+    return [(account.pk, account.email) for account in accounts]
+
+
+def cleanup():
+    from apps.users.models import User
+
+    User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+
+class DjangoClient:
+    """Requests through Django's WSGI handler, in this process."""
+
+    def __init__(self):
+        from django.test import Client
+
+        # Los 500 se cuentan como errores en lugar de propagar la excepción
+        self.client = Client(raise_request_exception=False)
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        if data is None:
+            response = getattr(self.client, method)(path, headers=headers)
+        else:
+            response = getattr(self.client, method)(
+                path, data=json.dumps(data), content_type='application/json',
+                headers=headers)
+        return response.status_code, response.content
+
+    def close(self):
+        from django.db import connection
+
+        connection.close()
+
+
+class HttpClient:
+    """Requests to a running server over one keep-alive connection."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        connection_class = (http.client.HTTPSConnection if parts.scheme == 'https'
+                            else http.client.HTTPConnection)
+        self.connection = connection_class(parts.netloc, timeout=60)
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        body = json.dumps(data) if data is not None else None
+        self.connection.request(method.upper(), path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        return response.status, response.read()
+
+    def close(self):
+        self.connection.close()
+
+
+class FlowFailed(Exception):
+    pass
+
+
+class Worker:
+
+    def __init__(self, client, page_size):
+        self.client = client
+        self.page_size = page_size
+        self.latencies = defaultdict(list)
+        self.flow_latencies = []
+        self.errors = defaultdict(Counter)
+        self.failed_flows = 0
+
+    def step(self, name, method, path, data=None, token=None):
+        started = time.perf_counter()
+        try:
+            status, body = self.client.request(method, path, data, token)
+        except Exception as exc:
+            self.errors[name][type(exc).__name__] += 1
+            raise FlowFailed(name)
+        self.latencies[name].append(time.perf_counter() - started)
+        if status not in EXPECTED_STATUS[name]:
+            self.errors[name][status] += 1
+            raise FlowFailed(name)
+        return body
+
+    def run_flow(self, user_id, email):
+        started = time.perf_counter()
+        try:
+            body = self.step('login', 'post', '/auth/login/',
+                             {'email': email, 'password': PASSWORD})
+            token = json.loads(body)['access_token']
+            self.step('list', 'get', f'/task/tasks/?page_size={self.page_size}', token=token)
+            body = self.step('create', 'post', '/task/tasks/', {
+                'title': 'Benchmark task', 'description': 'Created by bench_flows',
+                'status': 'pending', 'owner': user_id}, token=token)
+            task_id = json.loads(body)['data']['id']
+            self.step('update', 'patch', f'/task/tasks/{task_id}/',
+                      {'title': 'Benchmark task (edited)', 'status': 'in_progress'}, token=token)
+            self.step('destroy', 'delete', f'/task/tasks/{task_id}/', token=token)
+        except FlowFailed:
+            self.failed_flows += 1
+            return
+        self.flow_latencies.append(time.perf_counter() - started)
+
+    def run(self, accounts, index, workers, flows):
+        try:
+            # Cada flujo usa un usuario distinto del de los demás workers: un
+            # login revoca la sesión anterior del mismo usuario
+            for flow in range(flows):
+                self.run_flow(*accounts[(index + flow * workers) % len(accounts)])
+        finally:
+            self.client.close()
+
+
+def run(make_client, accounts, workers, flows, page_size):
+    pool_workers = [Worker(make_client(), page_size) for _ in range(workers)]
+    barrier = threading.Barrier(workers + 1)
+
+    def start(index):
+        barrier.wait()
+        pool_workers[index].run(accounts, index, workers, flows)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(start, index) for index in range(workers)]
+        barrier.wait()
+        started = time.perf_counter()
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - started
+
+    flow_latencies = [latency for worker in pool_workers for latency in worker.flow_latencies]
+    results = {'flows': dict(
+        summarize(flow_latencies, elapsed),
+        failed=sum(worker.failed_flows for worker in pool_workers),
+        histogram=histogram(flow_latencies))}
+    results['steps'] = {}
+    for name in STEPS:
+        latencies = [latency for worker in pool_workers for latency in worker.latencies[name]]
+        errors = Counter()
+        for worker in pool_workers:
+            errors.update(worker.errors[name])
+        results['steps'][name] = dict(
+            summarize(latencies, elapsed),
+            errors={str(status): count for status, count in errors.items()},
+            histogram=histogram(latencies))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=5000,
+                        help='Tasks seeded in total, spread over the users.')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--flows', type=int, default=20,
+                        help='Flows per worker.')
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--database', choices=['sqlite', 'postgresql'], default='sqlite')
+    parser.add_argument('--server', help='Base URL of a running server, e.g. http://127.0.0.1:8000')
+    parser.add_argument('--hash-iterations', type=int,
+                        help='PBKDF2 iterations for the seeded passwords (in-process only).')
+    args = parser.parse_args()
+    if args.users < args.workers:
+        parser.error('--users must be at least --workers')
+
+    setup_django(args.database, test_database=not args.server, concurrent_writes=True)
+
+    from django.conf import settings
+    from django.db import connection
+
+    if args.server:
+        make_client = lambda: HttpClient(args.server)  # noqa: E731
+    else:
+        settings.ALLOWED_HOSTS = ['*']
+        if args.hash_iterations:
+            settings.PASSWORD_HASHING = dict(
+                settings.PASSWORD_HASHING, PBKDF2_ITERATIONS=args.hash_iterations)
+        make_client = DjangoClient
+
+    accounts = seed(args.users, args.tasks)
+    try:
+        results = run(make_client, accounts, args.workers, args.flows, args.page_size)
+    finally:
+        if args.server:
+            cleanup()
+
+    emit({
+        'benchmark': 'auth_task_flows',
+        'target': args.server or 'in-process',
+        'database': connection.vendor,
+        'users': args.users,
+        'tasks': args.tasks,
+        'workers': args.workers,
+        'flows_per_worker': args.flows,
+        'hash_iterations': settings.PASSWORD_HASHING.get('PBKDF2_ITERATIONS'),
+        'results': results,
+    })
+
+
+if __name__ == '__main__':
+    main()
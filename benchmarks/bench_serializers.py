@@ -0,0 +1,83 @@
+"""
+Compares TaskListSerializer against the ValuesSerializer fast path.
+
+    python -m benchmarks.bench_serializers --tasks 10000 --repeat 5
+"""
+
+import argparse
+import time
+
+from benchmarks.common import emit, setup_django
+
+
+def seed(count):
+    from apps.tasks.models import Task
+    from apps.users.models import User
+
+    user = User.objects.create_user(
+        username='bench', email='bench@example.com', password='bench-pass',
+        first_name='Bench', last_name='User')
+    Task.objects.bulk_create(
+        [Task(owner=user, title=f'Task {i}', description='x' * 200,
+              status='pending', created_by='Bench User')
+         for i in range(count)],
+        batch_size=1000)
+    return user
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from apps.base.serializer import ValuesSerializer
+    from apps.tasks.models import Task
+    from apps.tasks.serializer.task_serializer import TaskListSerializer
+
+    seed(args.tasks)
+    queryset = Task.objects.order_by('-created_date', '-id')
+    values = ValuesSerializer.for_serializer(TaskListSerializer)
+    renderer = JSONRenderer()
+
+    def drf():
+        return renderer.render(TaskListSerializer(queryset.all(), many=True).data)
+
+    def fast():
+        return renderer.render(values.serialize(queryset.values(*values.columns)))
+
+    assert drf() == fast(), 'fast path output differs from TaskListSerializer'
+
+    drf_seconds = best_of(args.repeat, drf)
+    fast_seconds = best_of(args.repeat, fast)
+    emit({
+        'benchmark': 'task_list_serialization',
+        'rows': args.tasks,
+        'repeat': args.repeat,
+        'model_serializer': {
+            'seconds': round(drf_seconds, 4),
+            'us_per_row': round(drf_seconds / args.tasks * 1e6, 2),
+        },
+        'values_serializer': {
+            'seconds': round(fast_seconds, 4),
+            'us_per_row': round(fast_seconds / args.tasks * 1e6, 2),
+        },
+        'speedup': round(drf_seconds / fast_seconds, 2),
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/common.py
+
+import atexit
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(database='sqlite', test_database=True, concurrent_writes=False):
+    """
+    Configures Django and creates a throwaway test database (in-memory for
+    SQLite), so benchmarks never touch the development database.
+
+    ``database='postgresql'`` points the default connection at a local
+    PostgreSQL server described by the usual PGDATABASE, PGUSER,
+    PGPASSWORD, PGHOST and PGPORT variables (the test database is
+    ``test_<PGDATABASE>``). With ``test_database=False`` the configured
+    database is used as is.
+
+    ``concurrent_writes`` puts the SQLite test database in a temporary file
+    with a busy timeout: the shared in-memory database fails with "table is
+    locked" as soon as two threads write.
+    """
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+    from django.conf import settings
+
+    if database == 'postgresql':
+        settings.DATABASES = {'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('PGDATABASE', 'task_api'),
+            'USER': os.environ.get('PGUSER', ''),
+            'PASSWORD': os.environ.get('PGPASSWORD', ''),
+            'HOST': os.environ.get('PGHOST', 'localhost'),
+            'PORT': os.environ.get('PGPORT', '5432'),
+        }}
+    elif database != 'sqlite':
+        raise ValueError(f'Unsupported database: {database}')
+    elif test_database and concurrent_writes:
+        default = settings.DATABASES['default']
+        default['TEST'] = dict(default.get('TEST', {}), NAME=os.path.join(
+            tempfile.gettempdir(), f'task_api_bench_{os.getpid()}.sqlite3'))
+        # IMMEDIATE: una transacción que lee y luego escribe no puede fallar
+        # al promocionar su bloqueo; WAL: las lecturas no esperan a la escritura
+        default['OPTIONS'] = dict(default.get('OPTIONS', {}), timeout=30,
+                                  transaction_mode='IMMEDIATE',
+                                  init_command='PRAGMA journal_mode=WAL;')
+
+    import django
+    django.setup()
+
+    if not test_database:
+        return
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    if concurrent_writes:
+        atexit.register(connection.creation.destroy_test_db, old_name, verbosity=0)
+
+
+def emit(results):
+    json.dump(results, sys.stdout, indent=2, default=str)
+    sys.stdout.write('\n')
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(latencies, elapsed):
+    """Throughput and latency percentiles (ms) for a list of seconds."""
+    return {
+        'requests': len(latencies),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+    }
+
+
+# Límites superiores (ms) de los buckets del histograma de latencias
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def histogram(latencies, bounds=HISTOGRAM_BOUNDS_MS):
+    """Cumulative latency histogram (seconds in, ms buckets out), Prometheus style."""
+    buckets = [{'le': bound, 'count': sum(1 for latency in latencies
+                                         if latency * 1000 <= bound)}
+               for bound in bounds]
+    buckets.append({'le': '+Inf', 'count': len(latencies)})
+    return buckets
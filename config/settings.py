@@ -60,6 +60,7 @@ THIRD_PARTY_APPS = [
 INSTALLED_APPS = BASE_APPS + LOCAL_APPS + THIRD_PARTY_APPS
 
 MIDDLEWARE = [
+    'apps.base.middleware.EndpointMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -113,6 +114,34 @@ DATABASES = {
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
+# El primero es el que se usa para los hashes nuevos; el resto permite
+# verificar hashes antiguos
+PASSWORD_HASHERS = [
+    # Verifica también los hashes pbkdf2_sha256 existentes: no añadir el
+    # PBKDF2PasswordHasher de Django, que le quitaría ese algoritmo
+    'apps.authentication.hashers.CalibratedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Parámetros de CalibratedPBKDF2PasswordHasher. PBKDF2_ITERATIONS sale de
+# ``manage.py calibrate_password_hasher`` (None = valor por defecto de
+# Django). El pool limita los hashes simultáneos; si no hay hueco en
+# POOL_TIMEOUT segundos la petición recibe un 503.
+PASSWORD_HASHING = {
+    'PBKDF2_ITERATIONS': None,
+    'POOL_WORKERS': 4,
+    'POOL_QUEUE': 16,
+    'POOL_TIMEOUT': 2,
+}
+
+AUTHENTICATION_BACKENDS = [
+    'apps.authentication.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -153,3 +182,82 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 AUTH_USER_MODEL = 'users.User'
+
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'apps.authentication.authentication.JWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ],
+    'EXCEPTION_HANDLER': 'apps.authentication.exceptions.exception_handler',
+}
+
+# Métricas por endpoint (apps/base/metrics.py), consultables en
+# /metrics/endpoints/. BUFFER_SIZE: últimas peticiones que se guardan por
+# ruta; MAX_ROUTES acota la memoria si aparecen rutas nuevas sin fin.
+ENDPOINT_METRICS = {
+    'ENABLED': True,
+    'BUFFER_SIZE': 500,
+    'MAX_ROUTES': 200,
+}
+
+# Modo sin estado: el access token lleva los datos del usuario que usan las
+# vistas y JWTAuthentication no consulta la BD. Los cambios del usuario no
+# se ven hasta que caduca el token (15 minutos).
+JWT_STATELESS_AUTH = False
+
+# Cache en proceso de JWTAuthentication (tokens verificados y usuarios).
+# El TTL acota cuánto tarda otro proceso en ver una revocación.
+AUTH_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'TTL': 60,
+}
+
+# Filtro de Bloom de tokens revocados delante de BlacklistedToken
+TOKEN_BLOOM_FILTER = {
+    'CAPACITY': 100000,
+    'ERROR_RATE': 0.001,
+    'SYNC_INTERVAL': 5,
+    'REBUILD_INTERVAL': 300,
+    # Filas por debajo del último id que se releen en cada sincronización
+    'SYNC_OVERLAP': 1000,
+}
+
+# Máximo de tareas por petición en los endpoints bulk de TaskViewset
+TASK_BULK_MAX_ITEMS = 1000
+
+# Filas leídas por viaje al servidor en las exportaciones en streaming
+EXPORT_CHUNK_SIZE = 2000
+
+# Margen (segundos) que el endpoint de cambios deja sin entregar para no
+# saltar transacciones que aún no se han confirmado
+TASK_CHANGES_SETTLE_SECONDS = 1
+
+# URL del frontend para los enlaces de los correos
+FRONTEND_URL = 'http://localhost:3000'
+
+# Cola de correos (OutboxEmail) que vacía el comando send_queued_emails.
+# Reintentos con backoff exponencial: BACKOFF_SECONDS * 2 ** (intento - 1)
+EMAIL_OUTBOX = {
+    'BATCH_SIZE': 50,
+    'WORKERS': 4,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 30,
+    'MAX_BACKOFF_SECONDS': 3600,
+    'LEASE_SECONDS': 300,
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'task-api',
+    }
+}
+
+# Cache de respuestas de listas por usuario. Con varios procesos conviene
+# un backend compartido (Redis, Memcached) para que la invalidación llegue
+# a todos.
+LIST_RESPONSE_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+}
@@ -20,6 +20,8 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
 
+from apps.base.views import EndpointMetricsView
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Task API",
@@ -49,4 +51,7 @@ urlpatterns = [
 
     # Rutas de autenticación
     path('auth/', include('apps.authentication.urls')),
+
+    # Métricas por endpoint (solo administradores)
+    path('metrics/endpoints/', EndpointMetricsView.as_view(), name='endpoint-metrics'),
 ]